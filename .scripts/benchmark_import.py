@@ -0,0 +1,56 @@
+"""Report how long importing the integration and its sensor platform takes.
+
+Each measurement runs in a fresh interpreter with `-X importtime`, so modules
+cached by earlier runs do not hide the cost. Home Assistant must be installed.
+
+Usage: python3 .scripts/benchmark_import.py [--runs N] [--top N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+TARGETS = ["custom_components.mysutro", "custom_components.mysutro.sensor"]
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Returns self and cumulative microseconds per module imported by `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for target in TARGETS:
+        runs = [import_times(target) for _ in range(args.runs)]
+        cumulative = [run[target][1] / 1000 for run in runs if target in run]
+        print(f"{target}: median {statistics.median(cumulative):.1f} ms, "
+              f"min {min(cumulative):.1f} ms over {len(cumulative)} runs")
+
+        last = runs[-1]
+        heaviest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)
+        print("  heaviest imports by self time (last run):")
+        for name, (self_us, _) in heaviest[:args.top]:
+            print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Benchmark the gateway against the local fake Sutro server.
+
+For each pool count it measures setup (discovery + first fetch), per-poll
+latency, event-loop lag while polling, gateway memory per config entry (one
+pool each, coordinators and entities are not included), requests used by
+concurrent refreshes from every entry, and a 30 day history backfill.
+Setup steps and backfill pages broken by injected errors are retried.
+Home Assistant must be installed (the integration package imports it).
+
+Usage: python3 .scripts/benchmark_polling.py [--pools 1 10 100 300] [--polls N] [--latency-ms MS]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import aiohttp
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_sutro_server import FakeSutroServer  # noqa: E402
+from custom_components.mysutro.gateway import MySutroError, MySutroGateway  # noqa: E402
+from custom_components.mysutro.resilience import TokenBucket  # noqa: E402
+
+LAG_PROBE_INTERVAL = 0.005  # seconds
+SETUP_ATTEMPTS = 20  # tries of a setup step or backfill page under injected errors
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic probe wakes up, i.e. event-loop blocking"""
+    def __init__(self):
+        self.lags = []
+        self._task = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.lags.append(max(0.0, loop.time() - start - LAG_PROBE_INTERVAL))
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def _until_success(call):
+    """Awaits call() until it succeeds, returns its result and the failed tries."""
+    for attempt in range(SETUP_ATTEMPTS):
+        try:
+            return await call(), attempt
+        except MySutroError:
+            if attempt == SETUP_ATTEMPTS - 1:
+                raise
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f} ms"
+
+
+async def bench(pools: int, polls: int, latency: float, error_rate: float) -> None:
+    server = FakeSutroServer(pools=pools, latency=latency, error_rate=error_rate)
+    runner = await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            gateway = MySutroGateway(session, "fake-token")
+            gateway.api_endpoint = server.url
+            # The account rate budget would measure itself, not the gateway
+            gateway.rate_limit = TokenBucket(rate=1e6, capacity=1e6)
+            # An open circuit would turn injected errors into minutes of refusals
+            gateway.breaker.reset_timeout = 0
+            _, discover_failures = await _until_success(gateway.async_discover)
+            _, update_failures = await _until_success(gateway.async_update)
+            setup_failures = discover_failures + update_failures
+            setup = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            memory = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+            latencies = []
+            failed = 0
+            with LoopLagMonitor() as monitor:
+                for _ in range(polls):
+                    start = time.perf_counter()
+                    try:
+                        await gateway.async_update()
+                    except MySutroError:
+                        failed += 1
+                    latencies.append(time.perf_counter() - start)
+
+            # No freshness reuse, only single-flight may merge the refreshes
+            requests_before = server.requests
+            await asyncio.gather(
+                *(gateway.async_update(max_age=0) for _ in range(pools)), return_exceptions=True
+            )
+            coalesced = server.requests - requests_before
+
+            pool_id = next(iter(gateway.pools))
+            requests_before = server.requests
+            start = time.perf_counter()
+            end = server.now
+            readings = 0
+            backfill_failures = 0
+            while True:
+                page, page_failures = await _until_success(
+                    lambda: gateway.async_get_historical_readings(
+                        pool_id,
+                        (server.now - timedelta(days=30)).isoformat(),
+                        end.isoformat(),
+                        100,
+                    )
+                )
+                backfill_failures += page_failures
+                readings += len(page)
+                if len(page) < 100:
+                    break
+                end -= timedelta(hours=8) * len(page)
+            backfill = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    print(f"pools={pools}")
+    print(f"  setup (discover + first fetch): {_ms(setup)}, {setup_failures} failed tries")
+    print(f"  poll latency: p50 {_ms(statistics.median(latencies))}, "
+          f"p95 {_ms(sorted(latencies)[int(len(latencies) * 0.95) - 1])}, max {_ms(max(latencies))}")
+    print(f"  failed polls (after retries): {failed}, retries: {gateway.metrics.retries}")
+    print(f"  loop lag while polling: max {_ms(max(monitor.lags, default=0))}, "
+          f"total {_ms(sum(monitor.lags))}")
+    print(f"  memory after setup: {memory / 1024:.1f} KiB ({memory / pools:.0f} B per config entry)")
+    print(f"  requests for {pools} concurrent entry refreshes: {coalesced}")
+    print(f"  backfill of {readings} readings: {_ms(backfill)} in "
+          f"{server.requests - requests_before} request(s), {backfill_failures} failed tries")
+    print(f"  response bytes served: {server.bytes_sent}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pools", type=int, nargs="+", default=[1, 10, 100, 300])
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+    for pools in args.pools:
+        asyncio.run(bench(pools, args.polls, args.latency_ms / 1000, args.error_rate))
+
+
+if __name__ == "__main__":
+    main()
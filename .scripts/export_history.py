@@ -0,0 +1,75 @@
+"""Export a pool's historical readings to CSV or Parquet.
+
+Pages through historicalReadings a week at a time and streams the rows to the
+output, so memory stays flat however long the range. Running it again resumes
+after the last exported reading; the Sutro API keeps 30 days, so run it at
+least that often to build a longer archive. Home Assistant must be installed
+(the integration package imports it).
+
+Usage: python3 .scripts/export_history.py OUTPUT (--token T | --username U --password P)
+           [--pool-id ID] [--format csv|parquet] [--start ISO] [--end ISO]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from custom_components.mysutro.const import API_ENDPOINT, EXPORT_FORMAT_CSV, EXPORT_FORMATS  # noqa: E402
+from custom_components.mysutro.export import async_export_readings, create_writer  # noqa: E402
+from custom_components.mysutro.gateway import MySutroError, MySutroGateway, async_get_token  # noqa: E402
+
+
+def _datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def export(args) -> int:
+    async with aiohttp.ClientSession() as session:
+        token = args.token or await async_get_token(session, args.username, args.password, args.endpoint)
+        gateway = MySutroGateway(session, token, args.username, args.password)
+        gateway.api_endpoint = args.endpoint
+        pool_id = args.pool_id
+        if pool_id is None:
+            await gateway.async_discover()
+            pool_id = gateway.primary_pool_id
+        writer = await asyncio.to_thread(create_writer, args.output, args.format)
+        result = await async_export_readings(
+            gateway, pool_id, writer, args.start, args.end, run_blocking=asyncio.to_thread
+        )
+    if result.resumed_from:
+        print(f"resumed after {result.resumed_from.isoformat()}")
+    print(f"exported {result.rows} reading(s) of pool {pool_id} to {result.path}")
+    if result.rows:
+        print(f"  {result.first_reading.isoformat()} .. {result.last_reading.isoformat()}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="CSV file, or directory of Parquet parts")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=EXPORT_FORMAT_CSV)
+    parser.add_argument("--token")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--pool-id", help="defaults to the account's primary pool")
+    parser.add_argument("--start", type=_datetime, help="defaults to 30 days ago")
+    parser.add_argument("--end", type=_datetime, help="defaults to now")
+    parser.add_argument("--endpoint", default=API_ENDPOINT)
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("give --token, or --username and --password")
+    try:
+        sys.exit(asyncio.run(export(args)))
+    except MySutroError as ex:
+        sys.exit(f"export failed: {ex}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""A local stand-in for the Sutro GraphQL endpoint, for offline benchmarks.
+
+Answers the documents the integration sends (login, discovery, aliased getPool
+batches with their slow tiers, historicalReadings, test times, requested
+readings and the chemical catalog) with
+deterministic fixtures shaped like schema.graphql. Latency and failures can be injected.
+
+Usage: python3 .scripts/fake_sutro_server.py [--pools N] [--latency-ms MS] [--error-rate R]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+ALIAS_RE = re.compile(r"(p\d+): getPool\(poolId: (\d+)\)")
+SELECTION_RE = {
+    "latestReading": re.compile(r"latestReading \{ ([^}]*) \}"),
+    "device": re.compile(r"device \{ ([^}]*) \}"),
+}
+READING_INTERVAL = timedelta(hours=8)
+
+# Token returned by every login
+TOKEN = "fake-token"
+
+# Slow-changing objects, returned when their selection is in the query
+TIER_FIXTURES = {
+    "latestRecommendations": {
+        "conflictWarning": None,
+        "recommendations": [
+            {
+                "id": "1", "type": "PH", "decision": "HIGH", "treatment": "Add 12 oz of pH down",
+                "explanation": "Lowering pH keeps chlorine effective", "expiredAt": None,
+                "completedAt": None, "chemical": {"id": "7", "name": "pH Down", "upc": "012345678905"},
+            },
+            {
+                "id": "2", "type": "CHLORINE", "decision": "OK", "treatment": "", "explanation": "",
+                "expiredAt": None, "completedAt": None, "chemical": None,
+            },
+        ],
+    },
+    "poolProfile": {
+        "id": "1", "sanitizerName": "Chlorine", "phTarget": 7.5, "phOkayLow": 7.2, "phOkayHigh": 7.8,
+        "chlorineTarget": 3.0, "chlorineOkayLow": 1.0, "chlorineOkayHigh": 5.0,
+        "alkalinityTarget": 100.0, "alkalinityOkayLow": 80.0, "alkalinityOkayHigh": 120.0,
+    },
+    "cartridgeShipmentData": {
+        "currentlyEligibleForShipment": False, "wentUnderThresholdAt": None, "updatedAt": None,
+    },
+    "subscription": {"state": "ACTIVE"},
+}
+DEVICE_TIERS = ("cartridgeShipmentData", "subscription")
+
+CHEMICALS = [
+    {
+        "id": "7", "name": "pH Down", "upc": "012345678905", "types": ["PH_DOWN"], "manufacturer": "Sutro",
+        "packageSize": "2", "packageSizeUnit": "lb", "generic": False,
+    },
+    {
+        "id": "8", "name": "Sodium Bicarbonate", "upc": "000000000017", "types": ["ALKALINITY_UP", "PH_UP"],
+        "manufacturer": None, "packageSize": None, "packageSizeUnit": None, "generic": True,
+    },
+]
+
+
+def _iso(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class FakeSutroServer:
+    """Serves fixture data for `pools` pools
+
+    Args:
+        pools (int): number of pools on the fake account
+        latency (float): seconds added to every response
+        jitter (float): random extra seconds, up to this much
+        error_rate (float): share of requests answered with a 500
+        auth_error_rate (float): share of requests answered with an auth error
+    """
+    def __init__(self, pools=1, latency=0.0, jitter=0.0, error_rate=0.0, auth_error_rate=0.0, seed=0):
+        self.pool_ids = [str(1000 + index) for index in range(pools)]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.auth_error_rate = auth_error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.logins = 0
+        # A requested reading is acknowledged by the next poll watching for it and lands after
+        self.reading_requested = False
+        self.bytes_sent = 0
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/graphql", self.handle)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0) -> web.AppRunner:
+        """Starts the server, returns the runner; the URL is in `self.url`."""
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound_port = runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}/graphql"
+        return runner
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        payload = await request.json()
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = self.random.random()
+        if roll < self.error_rate:
+            return web.Response(status=500, text="injected failure")
+        if roll < self.error_rate + self.auth_error_rate:
+            return self._json({"data": None, "errors": [{"message": "unauthorized"}]})
+        if "me { id }" in payload.get("query", ""):
+            # Only the token this server issued passes the token probe
+            if request.headers.get("Authorization") != f"Bearer {TOKEN}":
+                return self._json({"data": {"me": None}, "errors": [{"message": "unauthorized"}]})
+            return self._json({"data": {"me": {"id": "1"}}})
+        return self._json(self.resolve(payload.get("query", ""), payload.get("variables") or {}))
+
+    def _json(self, body) -> web.Response:
+        text = json.dumps(body)
+        self.bytes_sent += len(text)
+        return web.Response(text=text, content_type="application/json")
+
+    def resolve(self, query: str, variables: dict) -> dict:
+        """Answers the handful of documents the integration sends."""
+        if "login(" in query:
+            self.logins += 1
+            return {"data": {"login": {"token": TOKEN, "user": {}, "__typename": "AuthResult"}}}
+        if "triggerReading" in query:
+            self.reading_requested = True
+            return {"data": {"triggerReading": "OK"}}
+        if "chemicals {" in query:
+            return {"data": {"chemicals": CHEMICALS}}
+        if "historicalReadings" in query:
+            return {"data": {"getPool": {"historicalReadings": self.history(variables)}}}
+        if "getRecurringTestTimes" in query:
+            schedule = {"hours": [2, 10, 18], "status": "DONE"}
+            return {"data": {"getRecurringTestTimes": schedule, "getCurrentTestTimes": schedule}}
+        if "homes" in query:
+            pools = [self.pool_summary(pool_id) for pool_id in self.pool_ids]
+            return {"data": {"me": {"pool": pools[0], "homes": [{"id": "1", "pools": pools}]}}}
+        aliases = ALIAS_RE.findall(query)
+        if aliases:
+            selections = {
+                name: pattern.search(query).group(1).split() if pattern.search(query) else None
+                for name, pattern in SELECTION_RE.items()
+            }
+            tiers = {name for name in TIER_FIXTURES if f"{name} {{" in query}
+            if "manualReadingsInProgress {" in query:
+                tiers.add("manualReadingsInProgress")
+            return {"data": {alias: self.pool(pool_id, selections, tiers) for alias, pool_id in aliases}}
+        return {"data": None, "errors": [{"message": "unsupported query"}]}
+
+    def pool_summary(self, pool_id: str) -> dict:
+        return {"id": pool_id, "name": f"Pool {pool_id}", "device": {"id": pool_id, "serialNumber": f"SN{pool_id}"}}
+
+    def reading(self, pool_id: str, when: datetime) -> dict:
+        rng = random.Random(f"{pool_id}-{when.isoformat()}")
+        return {
+            "id": f"{pool_id}-{int(when.timestamp())}",
+            "ph": round(rng.uniform(7.0, 7.8), 2),
+            "chlorine": round(rng.uniform(1.0, 4.0), 1),
+            "bromine": None,
+            "alkalinity": round(rng.uniform(80, 120), 1),
+            "minAlkalinity": 80.0,
+            "maxAlkalinity": 120.0,
+            "readingTime": _iso(when),
+            "invalidatingTrends": [],
+        }
+
+    def device(self, pool_id: str) -> dict:
+        return {
+            "batteryLevel": 87,
+            "temperature": 26.5,
+            "cartridgeCharges": 42,
+            "online": True,
+            "lidOpen": False,
+            "lastMessage": _iso(self.now),
+            "health": "GOOD",
+        }
+
+    def pool(self, pool_id: str, selections: dict, tiers: set = frozenset()) -> dict:
+        pool = {"id": pool_id}
+        reading = self.reading(pool_id, self.now)
+        fields = selections.get("latestReading")
+        pool["latestReading"] = {key: reading[key] for key in fields if key in reading} if fields else reading
+        if selections.get("device"):
+            device = self.device(pool_id)
+            pool["device"] = {key: device[key] for key in selections["device"] if key in device}
+        for tier in tiers:
+            if tier == "manualReadingsInProgress":
+                pool.setdefault("device", {})[tier] = self.manual_readings()
+            elif tier in DEVICE_TIERS:
+                pool.setdefault("device", {})[tier] = TIER_FIXTURES[tier]
+            else:
+                pool[tier] = TIER_FIXTURES[tier]
+        return pool
+
+    def manual_readings(self) -> list:
+        """Acknowledges a requested reading, the following poll returns it."""
+        if not self.reading_requested:
+            return []
+        self.reading_requested = False
+        self.now += timedelta(minutes=1)
+        return [{"id": "1", "status": "READING_ACKED_IN_PROGRESS"}]
+
+    def history(self, variables: dict) -> dict:
+        """Readings every eight hours, newest first, within the requested window."""
+        pool_id = str(variables.get("poolId", self.pool_ids[0]))
+        end = datetime.fromisoformat(variables["endDate"]) if variables.get("endDate") else self.now
+        start = datetime.fromisoformat(variables["startDate"]) if variables.get("startDate") else self.now - timedelta(days=30)
+        limit = variables.get("limit") or 1000
+        readings = []
+        when = self.now
+        while when >= start and len(readings) < limit:
+            if when <= end:
+                readings.append(self.reading(pool_id, when))
+            when -= READING_INTERVAL
+        return {"count": len(readings), "readings": readings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pools", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--auth-error-rate", type=float, default=0)
+    args = parser.parse_args()
+    server = FakeSutroServer(
+        pools=args.pools,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        auth_error_rate=args.auth_error_rate,
+    )
+    web.run_app(server.app(), port=args.port)
+
+
+if __name__ == "__main__":
+    main()
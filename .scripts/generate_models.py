@@ -0,0 +1,682 @@
+"""Validate the integration's GraphQL documents and generate typed decoders.
+
+Reads custom_components/scripts/schema.graphql and every document the
+integration sends (the *_QUERY and *_MUTATION constants of gateway.py and the
+batched pools query with every field and tier), checks each field, argument
+and variable against the schema, and writes custom_components/mysutro/generated.py
+with slotted dataclasses and decoders for the selections listed in DECODERS.
+Only the standard library is needed. gateway.py is parsed, not imported, so
+neither Home Assistant nor aiohttp has to be installed, and a new document
+can get its decoder before gateway.py imports it.
+
+Usage: python3 .scripts/generate_models.py [--check]
+  --check  exit 1 when a document does not validate or generated.py is out of date
+"""
+import argparse
+import ast
+import hashlib
+import importlib.util
+import re
+import sys
+import types
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+PACKAGE = REPO_ROOT / "custom_components" / "mysutro"
+SCHEMA = REPO_ROOT / "custom_components" / "scripts" / "schema.graphql"
+OUTPUT = PACKAGE / "generated.py"
+
+# Generated class -> (document constant, path of the selected list in the response)
+DECODERS = {
+    "HistoricalReading": ("HISTORICAL_READINGS_QUERY", ("getPool", "historicalReadings", "readings")),
+    "Chemical": ("CHEMICALS_QUERY", ("chemicals",)),
+}
+
+# Schema scalar -> (annotation, decoder helper in the generated module)
+SCALARS = {
+    "Float": ("float", "_float"),
+    "Int": ("int", "_int"),
+    "Boolean": ("bool", "_bool"),
+    "String": ("str", "_str"),
+    "ID": ("str", "_str"),
+    "DateTime": ("datetime", "_datetime"),
+}
+
+TOKEN_RE = re.compile(
+    r'(?P<block>"""[\s\S]*?""")'
+    r'|(?P<string>"(?:[^"\\\n]|\\.)*")'
+    r"|(?P<comment>#[^\n]*)"
+    r"|(?P<spread>\.\.\.)"
+    r"|(?P<punct>[!$&():=@\[\]{}|])"
+    r"|(?P<name>[_A-Za-z][_0-9A-Za-z]*)"
+    r"|(?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)"
+    r"|(?P<skip>[\s,﻿]+)"
+    # The published schema has enum values such as "---" and "EAU_SALÉE"
+    r"|(?P<other>.)"
+)
+
+
+class GraphQLSyntaxError(Exception):
+    """A schema or document could not be parsed."""
+
+
+def tokenize(text: str) -> list[tuple[str, str, int, int]]:
+    """Returns (kind, text, start, end) of every significant token."""
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if match is None:
+            raise GraphQLSyntaxError(f"Unexpected character {text[position]!r} at {position}")
+        kind = match.lastgroup
+        if kind not in ("skip", "comment"):
+            tokens.append((kind, match.group(), match.start(), match.end()))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """Recursive descent over the tokens of a schema or document"""
+    def __init__(self, text: str) -> None:
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> tuple[str, str] | None:
+        index = self.index + offset
+        return self.tokens[index][:2] if index < len(self.tokens) else None
+
+    def at(self, value: str) -> bool:
+        token = self.peek()
+        return token is not None and token[1] == value and token[0] in ("punct", "name", "spread")
+
+    def take(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise GraphQLSyntaxError("Unexpected end of input")
+        self.index += 1
+        return token
+
+    def enum_value(self) -> str:
+        """Reads an enum value, gluing tokens that are not separated."""
+        kind, text, start, end = self.tokens[self.index]
+        self.index += 1
+        while self.index < len(self.tokens) and self.tokens[self.index][2] == end and not self.at("@"):
+            text += self.tokens[self.index][1]
+            end = self.tokens[self.index][3]
+            self.index += 1
+        return text
+
+    def expect(self, value: str) -> None:
+        kind, text = self.take()
+        if text != value:
+            raise GraphQLSyntaxError(f"Expected {value!r}, found {text!r}")
+
+    def name(self) -> str:
+        kind, text = self.take()
+        if kind != "name":
+            raise GraphQLSyntaxError(f"Expected a name, found {text!r}")
+        return text
+
+    def skip_description(self) -> None:
+        while self.peek() and self.peek()[0] in ("block", "string"):
+            self.take()
+
+    def type_ref(self) -> str:
+        if self.at("["):
+            self.take()
+            inner = self.type_ref()
+            self.expect("]")
+            text = f"[{inner}]"
+        else:
+            text = self.name()
+        if self.at("!"):
+            self.take()
+            text += "!"
+        return text
+
+    def value(self):
+        """Parses a value, variables come back as ("$", name)."""
+        kind, text = self.take()
+        if text == "$":
+            return ("$", self.name())
+        if text == "[":
+            values = []
+            while not self.at("]"):
+                values.append(self.value())
+            self.take()
+            return values
+        if text == "{":
+            values = {}
+            while not self.at("}"):
+                key = self.name()
+                self.expect(":")
+                values[key] = self.value()
+            self.take()
+            return values
+        if kind in ("string", "block", "number", "name"):
+            return (kind, text)
+        raise GraphQLSyntaxError(f"Unexpected {text!r} in a value")
+
+    def directives(self) -> None:
+        while self.at("@"):
+            self.take()
+            self.name()
+            if self.at("("):
+                self.take()
+                while not self.at(")"):
+                    self.name()
+                    self.expect(":")
+                    self.value()
+                self.take()
+
+
+@dataclass
+class FieldDef:
+    type: str
+    args: dict[str, str] = field(default_factory=dict)
+    defaults: set[str] = field(default_factory=set)
+
+
+@dataclass
+class TypeDef:
+    kind: str
+    fields: dict[str, FieldDef] = field(default_factory=dict)
+    values: set[str] = field(default_factory=set)
+
+
+@dataclass
+class Schema:
+    types: dict[str, TypeDef]
+    roots: dict[str, str]
+
+
+def named_type(type_ref: str) -> str:
+    return type_ref.strip("[]!")
+
+
+def parse_schema(text: str) -> Schema:
+    parser = Parser(text)
+    types_: dict[str, TypeDef] = {
+        name: TypeDef("scalar") for name in ("Int", "Float", "String", "Boolean", "ID")
+    }
+    roots = {"query": "Query", "mutation": "Mutation"}
+    while parser.peek():
+        parser.skip_description()
+        keyword = parser.name()
+        if keyword == "schema":
+            parser.directives()
+            parser.expect("{")
+            while not parser.at("}"):
+                operation = parser.name()
+                parser.expect(":")
+                roots[operation] = parser.name()
+            parser.take()
+        elif keyword == "scalar":
+            types_[parser.name()] = TypeDef("scalar")
+            parser.directives()
+        elif keyword in ("type", "interface", "input"):
+            name = parser.name()
+            if parser.at("implements"):
+                parser.take()
+                while parser.peek()[0] == "name" or parser.at("&"):
+                    if parser.at("{") or parser.at("@"):
+                        break
+                    parser.take()
+            parser.directives()
+            definition = types_[name] = TypeDef(keyword)
+            parser.expect("{")
+            while not parser.at("}"):
+                parser.skip_description()
+                field_name = parser.name()
+                field_def = FieldDef("")
+                if parser.at("("):
+                    parser.take()
+                    while not parser.at(")"):
+                        parser.skip_description()
+                        arg = parser.name()
+                        parser.expect(":")
+                        field_def.args[arg] = parser.type_ref()
+                        if parser.at("="):
+                            parser.take()
+                            parser.value()
+                            field_def.defaults.add(arg)
+                        parser.directives()
+                    parser.take()
+                parser.expect(":")
+                field_def.type = parser.type_ref()
+                if parser.at("="):
+                    parser.take()
+                    parser.value()
+                parser.directives()
+                definition.fields[field_name] = field_def
+            parser.take()
+        elif keyword == "enum":
+            name = parser.name()
+            parser.directives()
+            definition = types_[name] = TypeDef("enum")
+            parser.expect("{")
+            while not parser.at("}"):
+                parser.skip_description()
+                definition.values.add(parser.enum_value())
+                parser.directives()
+            parser.take()
+        elif keyword == "union":
+            name = parser.name()
+            parser.directives()
+            parser.expect("=")
+            members = types_[name] = TypeDef("union")
+            if parser.at("|"):
+                parser.take()
+            members.values.add(parser.name())
+            while parser.at("|"):
+                parser.take()
+                members.values.add(parser.name())
+        elif keyword == "directive":
+            parser.expect("@")
+            parser.name()
+            if parser.at("("):
+                depth = 0
+                while True:
+                    kind, token = parser.take()
+                    depth += token == "("
+                    depth -= token == ")"
+                    if depth == 0:
+                        break
+            if parser.at("repeatable"):
+                parser.take()
+            parser.expect("on")
+            if parser.at("|"):
+                parser.take()
+            parser.name()
+            while parser.at("|"):
+                parser.take()
+                parser.name()
+        else:
+            raise GraphQLSyntaxError(f"Unsupported definition {keyword!r}")
+    return Schema(types_, roots)
+
+
+@dataclass
+class Selection:
+    name: str
+    alias: str
+    args: dict[str, object]
+    selections: list["Selection"] | None
+
+
+@dataclass
+class Operation:
+    kind: str
+    name: str | None
+    variables: dict[str, str]
+    variable_defaults: set[str]
+    selections: list[Selection]
+
+
+def _selection_set(parser: Parser) -> list[Selection]:
+    parser.expect("{")
+    selections = []
+    while not parser.at("}"):
+        if parser.at("..."):
+            raise GraphQLSyntaxError("Fragments are not supported")
+        alias = name = parser.name()
+        if parser.at(":"):
+            parser.take()
+            name = parser.name()
+        args = {}
+        if parser.at("("):
+            parser.take()
+            while not parser.at(")"):
+                arg = parser.name()
+                parser.expect(":")
+                args[arg] = parser.value()
+            parser.take()
+        parser.directives()
+        children = _selection_set(parser) if parser.at("{") else None
+        selections.append(Selection(name, alias, args, children))
+    parser.take()
+    return selections
+
+
+def parse_document(text: str) -> list[Operation]:
+    parser = Parser(text)
+    operations = []
+    while parser.peek():
+        kind, name, variables, defaults = "query", None, {}, set()
+        if not parser.at("{"):
+            kind = parser.name()
+            if parser.peek()[0] == "name":
+                name = parser.name()
+            if parser.at("("):
+                parser.take()
+                while not parser.at(")"):
+                    parser.expect("$")
+                    variable = parser.name()
+                    parser.expect(":")
+                    variables[variable] = parser.type_ref()
+                    if parser.at("="):
+                        parser.take()
+                        parser.value()
+                        defaults.add(variable)
+                    parser.directives()
+                parser.take()
+            parser.directives()
+        operations.append(Operation(kind, name, variables, defaults, _selection_set(parser)))
+    return operations
+
+
+def _compatible(variable: str, argument: str, has_default: bool) -> bool:
+    """True when a variable of one type can be passed to an argument of another."""
+    if argument.endswith("!"):
+        if not variable.endswith("!") and not has_default:
+            return False
+        return _compatible(variable.rstrip("!"), argument[:-1], has_default)
+    if variable.endswith("!"):
+        return _compatible(variable[:-1], argument, has_default)
+    if variable.startswith("[") and argument.startswith("["):
+        return _compatible(variable[1:-1], argument[1:-1], has_default)
+    return variable == argument
+
+
+def _literal_fits(value, type_ref: str, schema: Schema) -> bool:
+    target = named_type(type_ref)
+    if isinstance(value, list):
+        return all(_literal_fits(item, type_ref.strip("!")[1:-1] or target, schema) for item in value)
+    if isinstance(value, dict):
+        return schema.types.get(target, TypeDef("")).kind == "input"
+    kind, text = value
+    if kind == "number":
+        return target in ("Int", "Float", "ID") and (target != "Int" or re.fullmatch(r"-?\d+", text) is not None)
+    if kind in ("string", "block"):
+        return target not in ("Int", "Float", "Boolean") and schema.types[target].kind != "enum"
+    if text in ("true", "false"):
+        return target == "Boolean"
+    if text == "null":
+        return not type_ref.endswith("!")
+    return text in schema.types[target].values
+
+
+def validate(schema: Schema, operation: Operation, label: str) -> list[str]:
+    """Returns every problem of an operation, as readable messages."""
+    errors: list[str] = []
+    used: set[str] = set()
+
+    def walk(selections: list[Selection], parent: str, path: str) -> None:
+        definition = schema.types[parent]
+        for selection in selections:
+            where = f"{label}: {path}.{selection.name}"
+            if selection.name == "__typename":
+                continue
+            field_def = definition.fields.get(selection.name)
+            if field_def is None:
+                errors.append(f"{where}: {parent} has no field {selection.name}")
+                continue
+            for arg, value in selection.args.items():
+                arg_type = field_def.args.get(arg)
+                if arg_type is None:
+                    errors.append(f"{where}: unknown argument {arg}")
+                elif isinstance(value, tuple) and value[0] == "$":
+                    used.add(value[1])
+                    variable = operation.variables.get(value[1])
+                    if variable is None:
+                        errors.append(f"{where}: variable ${value[1]} is not declared")
+                    elif not _compatible(variable, arg_type, value[1] in operation.variable_defaults):
+                        errors.append(f"{where}: ${value[1]} is {variable}, {arg} expects {arg_type}")
+                elif not _literal_fits(value, arg_type, schema):
+                    errors.append(f"{where}: {value[1]!r} does not fit {arg} of type {arg_type}")
+            for arg, arg_type in field_def.args.items():
+                if arg_type.endswith("!") and arg not in selection.args and arg not in field_def.defaults:
+                    errors.append(f"{where}: missing required argument {arg}")
+            child = named_type(field_def.type)
+            leaf = schema.types[child].kind in ("scalar", "enum")
+            if leaf and selection.selections is not None:
+                errors.append(f"{where}: {child} is a leaf and takes no selection")
+            elif not leaf and selection.selections is None:
+                errors.append(f"{where}: {child} needs a selection")
+            elif not leaf:
+                walk(selection.selections, child, f"{path}.{selection.name}")
+
+    root = schema.roots.get(operation.kind)
+    if root not in schema.types:
+        return [f"{label}: the schema has no {operation.kind} root"]
+    walk(operation.selections, root, root)
+    for variable in operation.variables.keys() - used:
+        errors.append(f"{label}: variable ${variable} is never used")
+    return errors
+
+
+def gateway_documents(namespace: dict[str, object]) -> dict[str, str]:
+    """Reads the *_QUERY and *_MUTATION constants of gateway.py without importing it.
+
+    The constants are evaluated on their own, with only the names in namespace,
+    i.e. what query.py defines, e.g. READING_FIELDS.
+    """
+    documents = {}
+    for node in ast.parse((PACKAGE / "gateway.py").read_text(encoding="utf-8")).body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            continue
+        name = node.targets[0].id
+        if not name.endswith(("_QUERY", "_MUTATION")):
+            continue
+        try:
+            value = eval(compile(ast.Expression(node.value), "gateway.py", "eval"), {"__builtins__": {}}, namespace)
+        except Exception as ex:  # pylint: disable=broad-except
+            sys.exit(f"gateway.py:{node.lineno}: {name} must be built from literals and query.py names: {ex}")
+        if isinstance(value, str):
+            documents[name] = value
+    return documents
+
+
+def load_documents() -> dict[str, str]:
+    """Collects the integration's documents, importing only query.py, which needs no third-party package."""
+    package = types.ModuleType("mysutro")
+    package.__path__ = [str(PACKAGE)]
+    sys.modules["mysutro"] = package
+    spec = importlib.util.spec_from_file_location("mysutro.query", PACKAGE / "query.py")
+    query = importlib.util.module_from_spec(spec)
+    sys.modules["mysutro.query"] = query
+    spec.loader.exec_module(query)
+    documents = gateway_documents(vars(query))
+    # Every pool document is a subset of the one selecting all fields and tiers
+    documents["POOLS_QUERY"] = query.compile_pools_query(
+        ("1",), query.ALL_FIELDS, frozenset(query.TIERS)
+    ).document
+    return dict(sorted(documents.items()))
+
+
+def snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def decoder_fields(schema: Schema, operation: Operation, path: tuple[str, ...]) -> list[tuple[str, str]]:
+    """Returns (field name, schema type) of the selection at the end of a path."""
+    selections = operation.selections
+    parent = schema.roots[operation.kind]
+    for step in path:
+        selection = next(item for item in selections if item.alias == step)
+        parent = named_type(schema.types[parent].fields[selection.name].type)
+        selections = selection.selections
+    return [
+        (selection.alias, schema.types[parent].fields[selection.name].type)
+        for selection in selections
+        if selection.name != "__typename"
+    ]
+
+
+def _annotation(schema: Schema, type_ref: str) -> tuple[str, str, str]:
+    """Returns the annotation, the decode expression template and the default."""
+    name = named_type(type_ref)
+    scalar = SCALARS.get(name, ("str", "_str") if schema.types[name].kind == "enum" else ("Any", ""))
+    if type_ref.rstrip("!").startswith("["):
+        helper = scalar[1] or "_any"
+        return f"tuple[{scalar[0]}, ...]", f"_tuple({{value}}, {helper})", "()"
+    if not scalar[1]:
+        return "Any", "{value}", "None"
+    return f"{scalar[0]} | None", f"{scalar[1]}({{value}})", "None"
+
+
+HEADER = '''"""Typed decoders generated from the Sutro GraphQL schema.
+
+Generated by .scripts/generate_models.py from custom_components/scripts/schema.graphql,
+do not edit by hand. Run the script again after changing a query document.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+SCHEMA_SHA256 = "{schema_sha256}"
+
+# Query document constant -> sha256 of the document validated against the schema
+DOCUMENT_SHA256 = {{
+{documents}
+}}
+
+
+def _float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def _int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+def _bool(value: Any) -> bool | None:
+    return None if value is None else bool(value)
+
+
+def _str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _any(value: Any) -> Any:
+    return value
+
+
+def _datetime(value: Any) -> datetime | None:
+    # The API sends ISO-8601 with a Z suffix, which fromisoformat accepts
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _tuple(value: Any, decode) -> tuple:
+    return tuple(decode(item) for item in value or () if item is not None)
+'''
+
+
+def render_decoder(schema: Schema, class_name: str, constant: str, path: tuple[str, ...], operation: Operation) -> str:
+    fields_ = decoder_fields(schema, operation, path)
+    lines = [
+        "",
+        "",
+        "@dataclass(frozen=True, slots=True)",
+        f"class {class_name}:",
+        f'    """One item of {".".join(path)} selected by {constant}"""',
+    ]
+    for name, type_ref in fields_:
+        annotation, _, default = _annotation(schema, type_ref)
+        lines.append(f"    {snake_case(name)}: {annotation} = {default}")
+    lines += [
+        "",
+        "    @classmethod",
+        f"    def from_dict(cls, raw: dict[str, Any]) -> {class_name}:",
+        '        """Decodes one item keyed by API field names."""',
+        "        return cls(",
+    ]
+    for name, type_ref in fields_:
+        expression = _annotation(schema, type_ref)[1].format(value=f'raw.get("{name}")')
+        lines.append(f"            {snake_case(name)}={expression},")
+    lines += [
+        "        )",
+        "",
+        "    def get(self, key: str, default: Any = None) -> Any:",
+        '        """Returns a value by its API field name, like dict.get."""',
+        f"        attribute = {snake_case(class_name).upper()}_ATTRIBUTES.get(key)",
+        "        return default if attribute is None else getattr(self, attribute)",
+        "",
+        "    def as_dict(self) -> dict[str, Any]:",
+        '        """Returns the item keyed by API field names, datetimes as ISO strings."""',
+        "        return {",
+    ]
+    for name, type_ref in fields_:
+        attribute = snake_case(name)
+        if named_type(type_ref) == "DateTime" and not type_ref.rstrip("!").startswith("["):
+            lines.append(f'            "{name}": self.{attribute}.isoformat() if self.{attribute} else None,')
+        elif type_ref.rstrip("!").startswith("["):
+            lines.append(f'            "{name}": list(self.{attribute}),')
+        else:
+            lines.append(f'            "{name}": self.{attribute},')
+    lines += [
+        "        }",
+        "",
+        "",
+        f"{snake_case(class_name).upper()}_ATTRIBUTES = {{",
+        *(f'    "{name}": "{snake_case(name)}",' for name, _ in fields_),
+        "}",
+        "",
+        "",
+        f"def decode_{snake_case(class_name)}s(result: dict[str, Any]) -> list[{class_name}]:",
+        f'    """Decodes {".".join(path)} of a {constant} response.',
+        "",
+        "    Raises:",
+        "        KeyError, TypeError: the response does not hold the selection",
+        '    """',
+        "    items = result[\"data\"]" + "".join(f'["{step}"]' for step in path),
+        f"    return [{class_name}.from_dict(item) for item in items if item]",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def generate() -> tuple[str, list[str]]:
+    """Returns the generated module and every validation error."""
+    schema_text = SCHEMA.read_text(encoding="utf-8")
+    schema = parse_schema(schema_text)
+    documents = load_documents()
+    errors: list[str] = []
+    operations: dict[str, Operation] = {}
+    for constant, document in documents.items():
+        try:
+            parsed = parse_document(document)
+        except GraphQLSyntaxError as ex:
+            errors.append(f"{constant}: {ex}")
+            continue
+        for operation in parsed:
+            errors.extend(validate(schema, operation, constant))
+        operations[constant] = parsed[0]
+
+    source = HEADER.format(
+        schema_sha256=hashlib.sha256(schema_text.encode()).hexdigest(),
+        documents="\n".join(
+            f'    "{constant}": "{hashlib.sha256(document.encode()).hexdigest()}",'
+            for constant, document in documents.items()
+        ),
+    )
+    for class_name, (constant, path) in DECODERS.items():
+        if constant in operations:
+            source += render_decoder(schema, class_name, constant, path, operations[constant])
+    return source, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="verify instead of writing")
+    args = parser.parse_args()
+
+    source, errors = generate()
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+    if args.check:
+        current = OUTPUT.read_text(encoding="utf-8") if OUTPUT.exists() else ""
+        if current != source:
+            print(f"{OUTPUT.relative_to(REPO_ROOT)} is out of date, run {Path(__file__).name}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(1 if errors else 0)
+    if errors:
+        sys.exit(f"{len(errors)} document error(s), {OUTPUT.name} not written")
+    OUTPUT.write_text(source, encoding="utf-8")
+    print(f"wrote {OUTPUT.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,113 +1,631 @@
 """Integration to read data from mySutro."""
 from __future__ import annotations
-from email import header
-from typing import Sequence
-from urllib.request import Request
+from typing import Any
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
 import asyncio
+import sqlite3
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import device_registry as dr
-from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util import dt as dt_util
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
-from .const import DOMAIN
+from .const import (
+    ACCOUNTS,
+    BATCH_COALESCE_WINDOW,
+    CATALOG,
+    DOMAIN,
+    DEFAULT_SCHEDULING_MODE,
+    DEFAULT_TELEMETRY_GROUPS,
+    DEFAULT_UPDATE_INTERVAL,
+    PROP_MAP,
+    READING_BURST_DURATION,
+    READING_BURST_INTERVAL,
+    READING_LANDED_STATUSES,
+    READING_STORE_FILE,
+    SCHEDULING_ADAPTIVE,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+    STALE_DATA_MAX_AGE,
+    TELEMETRY_GROUPS,
+)
 
-from .gateway import *
+from .catalog import MySutroChemicalCatalog
+from .gateway import MySutroError, MySutroGateway
+from .history import STORAGE_VERSION as HISTORY_STORAGE_VERSION, MySutroHistorySync
+from .models import FIELD_ATTRIBUTES, PoolSnapshot
+from .query import ALL_FIELDS, required_fields
+from .reading_store import READING_API_FIELDS, MySutroReadingStore, remove_pool_readings
+from .scheduler import MySutroPollScheduler
+from .services import async_setup_services
+from .trends import TREND_KEYS, TREND_WINDOWS, MySutroTrends
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = ["sensor"]
+PLATFORMS = ["sensor", "binary_sensor"]
+
+# Fields read in the attributes of entities listening on another field
+FIELD_DEPENDENCIES = {"latestRecommendations": ("conflictWarning", "poolProfile")}
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
+    """Register the services, they outlive any single entry."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up House Audio Amplifier from a config entry."""
     # hass.data[DOMAIN][entry.entry_id] = MyApi(...)
-    hass.data[DOMAIN] = {}
-    api_lock = asyncio.Lock()
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    account = async_get_account(hass, entry)
+    try:
+        await _async_setup_pool(hass, entry, account)
+    except Exception:
+        # A retried setup must not find this attempt in the shared account
+        domain_data.pop(entry.entry_id, None)
+        _async_release_account(hass, _account_key(entry), entry.entry_id)
+        raise
+    return True
 
-    gateway = MySutroGateway(entry.data["token"])
+
+async def _async_setup_pool(hass: HomeAssistant, entry: ConfigEntry, account: dict[str, Any]) -> None:
+    """Sets up the entry's pool on the account's shared gateway."""
+    domain_data = hass.data[DOMAIN]
+    gateway = account["gateway"]
+    if not gateway.pools:
+        try:
+            await gateway.async_discover()
+        except MySutroError as error:
+            raise ConfigEntryNotReady(f"Could not discover pools: {error}") from error
+
+    pool_id = str(entry.data.get("pool_id") or gateway.primary_pool_id)
+
+    reading_store = MySutroReadingStore(
+        hass.config.path(STORAGE_DIR, READING_STORE_FILE),
+        gateway,
+        pool_id,
+        run_blocking=hass.async_add_executor_job,
+    )
+    try:
+        await reading_store.async_open()
+    except MySutroError as error:
+        raise ConfigEntryNotReady(str(error)) from error
+    entry.async_on_unload(reading_store.async_close)
+
+    catalog = domain_data.get(CATALOG)
+    if catalog is None:
+        catalog = domain_data[CATALOG] = MySutroChemicalCatalog(hass)
+    await catalog.async_load()
 
     coordinator = MySutroDataUpdateCoordinator(
         hass,
         config_entry=entry,
         gateway=gateway,
-        api_lock=api_lock,
+        api_lock=account["api_lock"],
+        pool_id=pool_id,
+        reading_store=reading_store,
+        catalog=catalog,
     )
 
-    hass.data[DOMAIN][entry.entry_id] = {
+    history = MySutroHistorySync(hass, entry, gateway, pool_id, reading_store)
+    await history.async_load()
+
+    domain_data[entry.entry_id] = {
         "coordinator": coordinator,
-        "listener": entry.add_update_listener(async_update_listener),
+        "history": history,
+        "readings": reading_store,
+        # entry.data may name another account by unload time, after the options flow
+        "account_key": _account_key(entry),
+        "entry_data": dict(entry.data),
+        "options": dict(entry.options),
     }
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
 
-    await coordinator.async_config_entry_first_refresh()
+    if await coordinator.async_restore():
+        # Entities start from the stored snapshot, the live fetch must not hold up startup
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_first_refresh"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    # Import any readings missed while Home Assistant was down, then follow new ones
+    history.async_schedule_sync()
+    entry.async_create_background_task(
+        hass, _async_seed_trends_after_sync(history, coordinator), f"{DOMAIN}_seed_trends"
+    )
+    entry.async_on_unload(
+        coordinator.async_add_listener(
+            lambda: history.async_check_reading(
+                coordinator.data.reading_time if coordinator.data else None
+            )
+        )
+    )
+    # The stored catalog serves lookups right away, a stale one is fetched again
+    catalog.async_check(entry, gateway)
+    entry.async_on_unload(
+        coordinator.async_add_listener(lambda: catalog.async_check(entry, gateway))
+    )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    return True
+
+
+async def _async_seed_trends_after_sync(history, coordinator) -> None:
+    """Seeds the trends once the sync has stored the history, it is fetched only once."""
+    await history.async_wait_sync()
+    await coordinator.async_seed_trends()
+
+
+def _account_key(entry: ConfigEntry) -> str:
+    return str(entry.data.get("username") or entry.data["token"]).lower()
+
+
+@callback
+def async_get_account(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Returns the gateway shared by every entry of the entry's account."""
+    accounts = hass.data.setdefault(DOMAIN, {}).setdefault(ACCOUNTS, {})
+    account = accounts.get(_account_key(entry))
+    if account is None:
+        account = accounts[_account_key(entry)] = {
+            "gateway": MySutroGateway(
+                async_get_clientsession(hass),
+                entry.data["token"],
+                username=entry.data.get("username"),
+                password=entry.data.get("password"),
+                on_token_refresh=lambda token: _async_store_token(hass, account, token),
+            ),
+            "api_lock": asyncio.Lock(),
+            "entries": set(),
+        }
+    account["entries"].add(entry.entry_id)
+    return account
+
+
+@callback
+def _async_store_token(hass: HomeAssistant, account: dict[str, Any], token: str) -> None:
+    """Persist a refreshed token in every entry of the account, without reloading."""
+    for entry_id in account["entries"]:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is None or entry.data.get("token") == token:
+            continue
+        hass.config_entries.async_update_entry(entry, data={**entry.data, "token": token})
+
+
+def _identity(data) -> dict[str, Any]:
+    """Entry data that requires a reload when it changes, the token is swapped live."""
+    return {key: value for key, value in data.items() if key != "token"}
 
 
 async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
     """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    if entry_data is None or _identity(entry_data["entry_data"]) != _identity(entry.data):
+        # Credentials or account changed
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    entry_data["entry_data"] = dict(entry.data)
+    coordinator = entry_data["coordinator"]
+    if entry.data.get("token") and entry.data["token"] != coordinator.gateway.token:
+        coordinator.gateway.token = entry.data["token"]
+    if entry_data["options"] != dict(entry.options):
+        entry_data["options"] = dict(entry.options)
+        await coordinator.async_apply_options(entry.options)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
-    await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+    await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
-    hass.data[DOMAIN].pop(entry.entry_id)
+    entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+
+    _async_release_account(hass, entry_data["account_key"], entry.entry_id)
 
     return True
 
 
+@callback
+def _async_release_account(hass: HomeAssistant, account_key: str, entry_id: str) -> None:
+    """Removes an entry from its account, the last one drops the gateway."""
+    accounts = hass.data[DOMAIN].get(ACCOUNTS, {})
+    account = accounts.get(account_key)
+    if account is not None:
+        account["gateway"].remove_fields(entry_id)
+        account["entries"].discard(entry_id)
+        if not account["entries"]:
+            accounts.pop(account_key)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the entry's stored snapshot, history mark and readings."""
+    snapshot = Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot")
+    stored = await snapshot.async_load() or {}
+    await snapshot.async_remove()
+    await Store(hass, HISTORY_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.history").async_remove()
+
+    # The reading database is shared, only the pool's rows go, unless another entry follows it
+    pool_id = entry.data.get("pool_id") or stored.get("pool_id")
+    if pool_id is None:
+        return
+    in_use = {
+        entry_data["coordinator"].pool_id
+        for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+        if entry_id not in (ACCOUNTS, CATALOG)
+    } | {
+        other.data.get("pool_id")
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    }
+    if str(pool_id) in in_use:
+        return
+    try:
+        await hass.async_add_executor_job(
+            remove_pool_readings, hass.config.path(STORAGE_DIR, READING_STORE_FILE), str(pool_id)
+        )
+    except (sqlite3.Error, OSError) as error:
+        _LOGGER.warning("Could not delete the stored readings of pool %s: %s", pool_id, error)
+
+
 class MySutroDataUpdateCoordinator(DataUpdateCoordinator):
     """ Update Coordinator for the integration """
-    def __init__(self, hass, *, gateway, config_entry, api_lock):
+    def __init__(self, hass, *, gateway, config_entry, api_lock, pool_id, reading_store, catalog):
         """Initialize the mySutro Data Update Coordinator."""
         self.config_entry = config_entry
         self.api_lock = api_lock
         self.gateway = gateway
+        self.pool_id = pool_id
+        self.reading_store = reading_store
+        self.catalog = catalog
 
         # Get update interval from options or use default
         options = getattr(config_entry, "options", {}) or {}
-        update_interval = int(options.get("update_interval", 30))
-        interval = timedelta(seconds=update_interval)
+        self.scheduler = MySutroPollScheduler(timedelta(seconds=DEFAULT_UPDATE_INTERVAL))
+        self._read_options(options)
+        self._changed_keys: set[str] | None = None
+        self.delivered_updates = 0
+        self.suppressed_updates = 0
+        self.trends = MySutroTrends()
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=interval,
+            config_entry=config_entry,
+            update_interval=self.scheduler.fast_interval,
+            # Listeners run on every poll, the changed keys decide which update
+            always_update=True,
+        )
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}.snapshot"
+        )
+        self.data_fetched_at: datetime | None = None
+        self.restored = False
+        self.stale = False
+        # Set while a requested reading is awaited with fast polls
+        self.burst_until: datetime | None = None
+        self._burst_reading: datetime | None = None
+        # Manual readings of earlier requests, known after the burst's first poll
+        self._burst_known: frozenset[str] | None = None
+
+    async def async_restore(self) -> bool:
+        """Load the last good snapshot saved by a previous run.
+
+        Returns:
+            bool: true when entities can start from restored data
+        """
+        stored = await self._store.async_load()
+        if not stored or not stored.get("data"):
+            return False
+        self.data = PoolSnapshot.from_dict(self.pool_id, stored["data"])
+        self.data_fetched_at = dt_util.parse_datetime(stored.get("fetched_at") or "")
+        self.restored = True
+        _LOGGER.debug("Restored snapshot fetched at %s", self.data_fetched_at)
+        return True
+
+    @callback
+    def _async_save_snapshot(self, data) -> None:
+        """Remember the last good snapshot, written to disk in the background."""
+        self.data_fetched_at = dt_util.utcnow()
+        self.restored = False
+        self.stale = False
+        self._store.async_delay_save(
+            lambda: {
+                "fetched_at": self.data_fetched_at.isoformat(),
+                # Names the pool's readings to delete when the entry is removed
+                "pool_id": self.pool_id,
+                "data": data.as_dict(),
+            },
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    def _read_options(self, options) -> None:
+        """Load the poll interval, scheduling mode and telemetry groups."""
+        update_interval = int(options.get("update_interval", DEFAULT_UPDATE_INTERVAL))
+        self.scheduler.fast_interval = timedelta(seconds=update_interval)
+        self.scheduling_mode = options.get("scheduling_mode", DEFAULT_SCHEDULING_MODE)
+        groups = options.get("telemetry_groups", DEFAULT_TELEMETRY_GROUPS)
+        self.disabled_fields = frozenset(
+            field
+            for group, fields in TELEMETRY_GROUPS.items()
+            if group not in groups
+            for field in fields
         )
 
+    async def async_apply_options(self, options) -> None:
+        """Apply changed options to the running coordinator and poll with them."""
+        self._read_options(options)
+        self.update_interval = self.scheduler.fast_interval
+        _LOGGER.debug("Applied options: %s", options)
+        self._async_update_all_listeners()
+        await self.async_request_refresh()
+
+    def field_enabled(self, key: str) -> bool:
+        """Returns false for fields of a switched off telemetry group."""
+        return key not in self.disabled_fields
+
     async def _async_update_data(self):
-        """Fetch data from the Screenlogic gateway."""
-        # try:
+        """Fetch the pool's data from the Sutro API."""
+        self._changed_keys = None
         async with self.api_lock:
-            await self.hass.async_add_executor_job(self.gateway.update)
-        # except Exception as error:
-        #     _LOGGER.warning("mySutroError: %s", error)
+            fields = required_fields(self.async_contexts()) or ALL_FIELDS
+            for field, dependencies in FIELD_DEPENDENCIES.items():
+                if field in fields:
+                    fields = fields | frozenset(dependencies)
+            if not fields.isdisjoint(TREND_KEYS):
+                # Trend sensors follow a chemistry value and skip flagged readings
+                fields = fields | {TREND_KEYS[key] for key in fields & TREND_KEYS.keys()} | {"invalidatingTrends"}
+            # Every poll's reading goes into the reading store, complete
+            fields = fields | READING_API_FIELDS
+            if self.burst_until is not None:
+                # Shows whether the device is still working on the requested reading
+                fields = fields | {"manualReadingsInProgress"}
+            self.gateway.set_fields(self.config_entry.entry_id, fields - self.disabled_fields)
+            try:
+                # Other entries of the account polling at the same moment share this fetch
+                await self.gateway.async_update(max_age=BATCH_COALESCE_WINDOW)
+            except MySutroError as error:
+                return self._async_serve_stale(error)
+            data = self.gateway.pool_data.get(self.pool_id)
+        # The lock only keeps the selection and the fetch together, nothing below depends on it
+        with self.gateway.timings.span("changes"):
+            # The first live fetch after a restore or outage clears those flags everywhere
+            update_all = self.restored or self.stale
+            new_reading = data is not None and self.trends.add_reading(
+                data.reading_time,
+                {key: data.get(key) for key in PROP_MAP},
+                bool(data.invalidating_trends),
+            )
+            # A device that stopped reporting must not keep showing old averages
+            expired = self.trends.expire(dt_util.utcnow())
+            if not update_all:
+                self._changed_keys = data.changed_fields(self.data) if data else set()
+                if new_reading:
+                    # Every window moves with a new reading, even when a value repeats
+                    self._changed_keys |= TREND_KEYS.keys()
+                self._changed_keys |= expired
+                for field, dependencies in FIELD_DEPENDENCIES.items():
+                    if not self._changed_keys.isdisjoint(dependencies):
+                        self._changed_keys.add(field)
+        if data:
+            self._async_save_snapshot(data)
+            await self._async_store_reading(data)
+        if self.scheduling_mode == SCHEDULING_ADAPTIVE:
+            await self._async_reschedule(data)
+        else:
+            self.update_interval = self.scheduler.fast_interval
+        if self.burst_until is not None:
+            self._async_check_burst(data)
+
+        return data
+
+    async def async_request_reading(self, reading_type: str = "FULL") -> str | None:
+        """Triggers a reading and polls quickly until it lands.
+
+        Raises:
+            MySutroError: the reading could not be requested
+        """
+        result = await self.gateway.async_trigger_reading(self.pool_id, reading_type)
+        # Before the first poll the newest stored reading is the one to beat
+        self._burst_reading = (
+            self.data.reading_time if self.data else None
+        ) or self.reading_store.newest_reading_time
+        self._burst_known = None
+        self.burst_until = dt_util.utcnow() + timedelta(seconds=READING_BURST_DURATION)
+        _LOGGER.info("Requested a reading, polling every %d s until it lands", READING_BURST_INTERVAL)
+        self.update_interval = timedelta(seconds=READING_BURST_INTERVAL)
+        await self.async_request_refresh()
+        return result
+
+    @callback
+    def _async_check_burst(self, data: PoolSnapshot | None) -> None:
+        """Ends a reading burst once its reading landed, failed or took too long.
+
+        manualReadingsInProgress lists the manual readings of the last day.
+        Those already finished or timed out on the first poll after the
+        request belong to earlier requests and are ignored.
+        """
+        manual_readings = data.manual_readings if data is not None else ()
+        if self._burst_known is None:
+            self._burst_known = frozenset(
+                reading.id for reading in manual_readings
+                if reading.status in READING_LANDED_STATUSES or reading.status == "TIMED_OUT"
+            )
+        statuses = {reading.status for reading in manual_readings if reading.id not in self._burst_known}
+        if data is not None and data.reading_time is not None and (
+            # Only a pool that never took a reading has nothing to compare with
+            self._burst_reading is None or data.reading_time > self._burst_reading
+        ):
+            _LOGGER.info("Requested reading landed at %s", data.reading_time)
+        elif not statuses.isdisjoint(READING_LANDED_STATUSES):
+            # An identical reading leaves latestReading on the older one
+            _LOGGER.info("Requested reading landed")
+        elif "TIMED_OUT" in statuses:
+            _LOGGER.warning("The device timed out taking the requested reading")
+        elif dt_util.utcnow() >= self.burst_until:
+            _LOGGER.warning("No reading within %d s of the request", READING_BURST_DURATION)
+        else:
+            self.update_interval = min(self.update_interval, timedelta(seconds=READING_BURST_INTERVAL))
+            return
+        # The interval chosen by the scheduling mode applies again
+        self.burst_until = None
+        self._burst_reading = None
+        self._burst_known = None
+
+    async def _async_store_reading(self, data: PoolSnapshot) -> None:
+        """Adds the latest reading to the local store, extending its coverage to now."""
+        try:
+            await self.reading_store.async_add_latest(
+                data, self.data_fetched_at, self.gateway.query_fields
+            )
+        except MySutroError as error:
+            _LOGGER.warning("Could not store the latest reading: %s", error)
+
+    async def async_seed_trends(self) -> None:
+        """Fill the trend windows with the readings of the longest window."""
+        now = dt_util.utcnow()
+        start = now - timedelta(seconds=max(TREND_WINDOWS.values()))
+        try:
+            readings = [
+                (reading.reading_time, reading, bool(reading.invalidating_trends))
+                for reading in await self.reading_store.async_get_readings(start, now)
+            ]
+        except MySutroError as error:
+            _LOGGER.warning("Could not load recent readings for trends: %s", error)
+            return
+        self.trends.seed(readings)
+        _LOGGER.debug("Seeded trends with %d reading(s)", len(readings))
+        self._async_update_all_listeners()
+
+    @callback
+    def _async_serve_stale(self, error: MySutroError) -> PoolSnapshot:
+        """Keep serving the last good data while it is recent enough.
+
+        Raises:
+            UpdateFailed: there is no data younger than STALE_DATA_MAX_AGE
+        """
+        # Wait at least until the open circuit lets a request through again
+        retry_after = timedelta(seconds=self.gateway.breaker.retry_after)
+        if retry_after > self.update_interval:
+            self.update_interval = retry_after
+        fetched_at = self.data_fetched_at
+        if (
+            self.data is None
+            or fetched_at is None
+            or dt_util.utcnow() - fetched_at > timedelta(seconds=STALE_DATA_MAX_AGE)
+        ):
+            raise UpdateFailed(f"Error communicating with the Sutro API: {error}") from error
+        if not self.stale:
+            _LOGGER.warning("Serving data fetched at %s, the Sutro API failed: %s", fetched_at, error)
+        # Every entity picks up the stale flag once, later only listeners without a context
+        self._changed_keys = set() if self.stale else None
+        self.stale = True
+        return self.data
+
+    @callback
+    def _async_update_all_listeners(self) -> None:
+        """Update every listener, whatever the last fetch changed."""
+        self._changed_keys = None
+        self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update only the listeners whose value changed in the last fetch.
+
+        Listeners without a context, and every listener after a failure,
+        recovery, restore or option change, are always updated.
+        """
+        changed = self._changed_keys
+        self._changed_keys = None
+        # Entities compute and write their state here, all on the event loop
+        with self.gateway.timings.span("listeners"):
+            if changed is None:
+                self.delivered_updates += len(self._listeners)
+                super().async_update_listeners()
+                return
+            for update_callback, context in list(self._listeners.values()):
+                if context is None or context in changed:
+                    self.delivered_updates += 1
+                    update_callback()
+                else:
+                    self.suppressed_updates += 1
+
+    @property
+    def update_stats(self) -> dict[str, int]:
+        """Counters of listener updates delivered and suppressed."""
+        return {
+            "delivered_updates": self.delivered_updates,
+            "suppressed_updates": self.suppressed_updates,
+        }
 
-        return self.gateway.data
+    async def _async_reschedule(self, data) -> None:
+        """Adapt the poll interval to the next expected reading."""
+        now = dt_util.utcnow()
+        if self.scheduler.needs_test_times(now):
+            try:
+                self.scheduler.set_test_hours(
+                    await self.gateway.async_get_test_times(self.gateway.device_id(self.pool_id)),
+                    now,
+                )
+            except MySutroError as error:
+                _LOGGER.warning("Could not load the test schedule: %s", error)
+        last_reading = data.reading_time if data else None
+        self.update_interval = self.scheduler.next_interval(last_reading, now)
+        _LOGGER.debug("Next poll in %s", self.update_interval)
 
 
 class MySutroEntity(CoordinatorEntity):
     """ Represents the Sutro Device """
     def __init__(self, coordinator, data_key):
         """Initialize of the entity."""
-        super().__init__(coordinator)
+        # The data key doubles as listener context, it selects the fields to query
+        super().__init__(coordinator, context=data_key)
         self._data_key = data_key
+        self._snapshot_attribute = FIELD_ATTRIBUTES.get(data_key)
         self._enabled_default = True
 
+    @property
+    def value(self) -> Any:
+        """The entity's value in the current snapshot."""
+        data = self.coordinator.data
+        if not data or self._snapshot_attribute is None:
+            return None
+        return getattr(data, self._snapshot_attribute)
+
     def unload(self):
         """ Unloads the integration """
         return True
 
+    @property
+    def available(self) -> bool:
+        """Unavailable while the entity's telemetry group is switched off."""
+        return super().available and self.coordinator.field_enabled(self._data_key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag values restored from the last run or kept through an API outage."""
+        if not (self.coordinator.restored or self.coordinator.stale):
+            return None
+        fetched_at = self.coordinator.data_fetched_at
+        attributes = {"data_fetched_at": fetched_at.isoformat() if fetched_at else None}
+        if self.coordinator.restored:
+            attributes["restored"] = True
+        if self.coordinator.stale:
+            attributes["stale"] = True
+        return attributes
+
     @property
     def entity_registry_enabled_default(self):
         """Entity enabled by default."""
@@ -136,7 +654,8 @@ class MySutroEntity(CoordinatorEntity):
     @property
     def gateway_name(self) -> str:
         """Return the configured name of the gateway."""
-        return self.gateway.name
+        pool = self.gateway.pools.get(self.coordinator.pool_id) or {}
+        return pool.get("name") or self.gateway.name
 
     @property
     def device_info(self):
@@ -0,0 +1,171 @@
+"""Chemical product catalog, synced to storage and looked up locally."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import hashlib
+import json
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import CATALOG_RETRY, CATALOG_STORAGE_VERSION, CATALOG_TTL, DOMAIN
+from .gateway import MySutroError, MySutroGateway
+from .generated import DOCUMENT_SHA256, Chemical
+
+_LOGGER = logging.getLogger(__name__)
+
+# A stored catalog fetched with another selection lacks fields, it is fetched again
+CATALOG_DOCUMENT = DOCUMENT_SHA256["CHEMICALS_QUERY"]
+
+
+def upc_key(upc: str | None) -> str | None:
+    """Normalizes a barcode, UPC-A and its EAN-13 form only differ by a leading zero."""
+    digits = "".join(char for char in upc or "" if char.isdigit())
+    return digits.lstrip("0") or None
+
+
+def _digest(chemicals: list[Chemical]) -> str:
+    """Fingerprint of a catalog, independent of the order the API returns it in."""
+    items = sorted(json.dumps(chemical.as_dict(), sort_keys=True) for chemical in chemicals)
+    return hashlib.sha256("\n".join(items).encode()).hexdigest()
+
+
+class MySutroChemicalCatalog:
+    """Every chemical product of the Sutro app, indexed by id, UPC and type
+
+    The catalog is shared by every entry and kept in storage. It is fetched
+    again once it is older than CATALOG_TTL days, a fetch returning the same
+    products only renews its age. Lookups never touch the API.
+
+    Args:
+        hass (HomeAssistant): the running instance
+    """
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, CATALOG_STORAGE_VERSION, f"{DOMAIN}.chemicals"
+        )
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._task: asyncio.Task | None = None
+        self._retry_at: datetime | None = None
+        self.fetched_at: datetime | None = None
+        self.digest: str | None = None
+        self._chemicals: tuple[Chemical, ...] = ()
+        self._by_id: dict[str, Chemical] = {}
+        self._by_upc: dict[str, Chemical] = {}
+        self._by_type: dict[str, tuple[Chemical, ...]] = {}
+
+    async def async_load(self) -> None:
+        """Restores the stored catalog, once for every entry."""
+        async with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            stored = await self._store.async_load()
+            if not stored:
+                return
+            if stored.get("document") != CATALOG_DOCUMENT:
+                _LOGGER.debug("Stored chemical catalog has another selection, fetching it again")
+                return
+            self._index([Chemical.from_dict(item) for item in stored.get("chemicals") or ()])
+            self.fetched_at = dt_util.parse_datetime(stored.get("fetched_at") or "")
+
+    @property
+    def stale(self) -> bool:
+        """True when the catalog was never fetched or is older than CATALOG_TTL days."""
+        return self.fetched_at is None or dt_util.utcnow() - self.fetched_at >= timedelta(days=CATALOG_TTL)
+
+    @callback
+    def async_check(self, entry: ConfigEntry, gateway: MySutroGateway) -> None:
+        """Refreshes a stale catalog in the background, unless a fetch just failed."""
+        if not self.stale or (self._task and not self._task.done()):
+            return
+        if self._retry_at is not None and dt_util.utcnow() < self._retry_at:
+            return
+        self._task = entry.async_create_background_task(
+            self.hass, self._async_run_refresh(gateway), f"{DOMAIN}_catalog_refresh"
+        )
+
+    async def _async_run_refresh(self, gateway: MySutroGateway) -> None:
+        try:
+            await self.async_refresh(gateway)
+        except MySutroError as e:
+            self._retry_at = dt_util.utcnow() + timedelta(seconds=CATALOG_RETRY)
+            _LOGGER.warning("Chemical catalog refresh failed, keeping the stored one: %s", e)
+
+    async def async_refresh(self, gateway: MySutroGateway, force: bool = False) -> bool:
+        """Fetches the catalog when it is stale, or always when forced.
+
+        Returns:
+            bool: True when the products changed
+
+        Raises:
+            MySutroError: the catalog could not be fetched
+        """
+        async with self._lock:
+            if not force and not self.stale:
+                return False
+            chemicals = await gateway.async_get_chemicals()
+            if not chemicals:
+                # An empty answer is a backend hiccup, not a catalog without products
+                raise MySutroError("The chemical catalog is empty")
+            digest = _digest(chemicals)
+            changed = digest != self.digest
+            if changed:
+                self._index(chemicals, digest)
+                _LOGGER.info("Chemical catalog updated, %d products", len(chemicals))
+            self.fetched_at = dt_util.utcnow()
+            self._retry_at = None
+            await self._store.async_save(
+                {
+                    "document": CATALOG_DOCUMENT,
+                    "fetched_at": self.fetched_at.isoformat(),
+                    "chemicals": [chemical.as_dict() for chemical in self._chemicals],
+                }
+            )
+            return changed
+
+    def _index(self, chemicals: list[Chemical], digest: str | None = None) -> None:
+        by_type: dict[str, list[Chemical]] = {}
+        for chemical in chemicals:
+            for chemical_type in chemical.types:
+                by_type.setdefault(chemical_type, []).append(chemical)
+        self._chemicals = tuple(chemicals)
+        self._by_id = {chemical.id: chemical for chemical in chemicals if chemical.id}
+        self._by_upc = {upc_key(chemical.upc): chemical for chemical in chemicals if upc_key(chemical.upc)}
+        self._by_type = {chemical_type: tuple(items) for chemical_type, items in by_type.items()}
+        self.digest = digest or _digest(chemicals)
+
+    def __len__(self) -> int:
+        return len(self._chemicals)
+
+    def by_id(self, chemical_id: str | None) -> Chemical | None:
+        return self._by_id.get(chemical_id) if chemical_id else None
+
+    def by_upc(self, upc: str | None) -> Chemical | None:
+        key = upc_key(upc)
+        return self._by_upc.get(key) if key else None
+
+    def by_type(self, chemical_type: str) -> tuple[Chemical, ...]:
+        """Products of a ChemicalType, e.g. PH_DOWN, in catalog order."""
+        return self._by_type.get(chemical_type, ())
+
+    def resolve(self, chemical_id: str | None = None, upc: str | None = None) -> Chemical | None:
+        """Returns the product with this id, else the one with this UPC."""
+        return self.by_id(chemical_id) or self.by_upc(upc)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Age and size of the catalog, for diagnostics."""
+        return {
+            "products": len(self._chemicals),
+            "types": {chemical_type: len(items) for chemical_type, items in sorted(self._by_type.items())},
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+            "stale": self.stale,
+            "digest": self.digest,
+        }
@@ -5,7 +5,6 @@ import logging
 from typing import Any
 
 import voluptuous as vol
-import requests
 
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
@@ -13,15 +12,31 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
-
-from .const import DOMAIN, API_ENDPOINT, USER_AGENT, CONTENT_TYPE, INTEGRATION_TITLE, ERROR_CANNOT_CONNECT, ERROR_INVALID_AUTH, ERROR_UNKNOWN, DEFAULT_UPDATE_INTERVAL, MIN_UPDATE_INTERVAL
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, INTEGRATION_TITLE, ERROR_CANNOT_CONNECT, ERROR_INVALID_AUTH, ERROR_UNKNOWN, DEFAULT_UPDATE_INTERVAL, MIN_UPDATE_INTERVAL, DEFAULT_SCHEDULING_MODE, SCHEDULING_MODES, DEFAULT_TELEMETRY_GROUPS, TELEMETRY_GROUPS
+from .gateway import (
+    MySutroAuthError,
+    MySutroConnectionError,
+    MySutroError,
+    MySutroGateway,
+    async_check_token,
+    async_login,
+)
 class MySutroOptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         if user_input is not None:
             # Validate credentials and update entry
             try:
                 hass = self.hass
-                info = await validate_input(hass, user_input)
+                current = self.config_entry.data
+                unchanged = (
+                    user_input["username"] == current.get("username")
+                    and user_input["password"] == current.get("password")
+                )
+                # Saving options with the same credentials only probes the stored token
+                info = await validate_input(hass, user_input, current.get("token") if unchanged else None)
             except CannotConnect:
                 return self.async_show_form(
                     step_id="init",
@@ -48,8 +63,13 @@ class MySutroOptionsFlowHandler(config_entries.OptionsFlow):
                 "password": user_input["password"],
                 "token": info["token"],
             })
+            if data != dict(self.config_entry.data):
+                # A token-only change is applied live, new credentials reload the entry
+                self.hass.config_entries.async_update_entry(self.config_entry, data=data)
             options = dict(self.config_entry.options)
             options["update_interval"] = user_input["update_interval"]
+            options["scheduling_mode"] = user_input["scheduling_mode"]
+            options["telemetry_groups"] = user_input["telemetry_groups"]
             return self.async_create_entry(title="", data=options)
 
         # Show form with current values as defaults
@@ -59,6 +79,8 @@ class MySutroOptionsFlowHandler(config_entries.OptionsFlow):
             "username": defaults.get("username", ""),
             "password": defaults.get("password", ""),
             "update_interval": options.get("update_interval", DEFAULT_UPDATE_INTERVAL),
+            "scheduling_mode": options.get("scheduling_mode", DEFAULT_SCHEDULING_MODE),
+            "telemetry_groups": options.get("telemetry_groups", DEFAULT_TELEMETRY_GROUPS),
         })
         return self.async_show_form(step_id="init", data_schema=schema)
 
@@ -67,6 +89,8 @@ class MySutroOptionsFlowHandler(config_entries.OptionsFlow):
             vol.Required("username", default=user_input.get("username", "")): str,
             vol.Required("password", default=user_input.get("password", "")): str,
             vol.Required("update_interval", default=user_input.get("update_interval", DEFAULT_UPDATE_INTERVAL)): vol.All(int, vol.Range(min=MIN_UPDATE_INTERVAL, max=3600)),
+            vol.Required("scheduling_mode", default=user_input.get("scheduling_mode", DEFAULT_SCHEDULING_MODE)): vol.In(SCHEDULING_MODES),
+            vol.Required("telemetry_groups", default=user_input.get("telemetry_groups", DEFAULT_TELEMETRY_GROUPS)): cv.multi_select({group: group for group in TELEMETRY_GROUPS}),
         })
 
 _LOGGER = logging.getLogger(__name__)
@@ -78,57 +102,36 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
-def get_token(username: str, password: str) -> str:
-    """Perform the login mutation to retrieve a token from the Sutro API."""
-    url = API_ENDPOINT
-    headers = {
-        "Content-Type": CONTENT_TYPE,
-        "User-Agent": USER_AGENT,
-        "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Connection": "keep-alive",
-    }
-    payload = {
-        "operationName": None,
-        "variables": {
-            "email": username,
-            "password": password,
-            "focusedInput": "",
-            "loading": False
-        },
-        "query": "mutation ($email: String!, $password: String!) { login(email: $email, password: $password) { user { firstName lastName email phone releaseGroup __typename } token __typename } }"
-    }
-
-    try:
-        _LOGGER.debug("Sending login request to Sutro API")
-        resp = requests.post(url, json=payload, headers=headers, timeout=10)
-        resp.raise_for_status()
-        _LOGGER.debug("Login request successful, parsing response")
-        data = resp.json()
-        token = data.get("data", {}).get("login", {}).get("token")
-    except requests.RequestException as ex:
-        _LOGGER.error("Failed to connect to Sutro API: %s", ex)
-        raise CannotConnect from ex
-    except ValueError as ex:
-        _LOGGER.error("Failed to parse response from Sutro API: %s", ex)
-        raise InvalidAuth("Invalid response from Sutro API") from ex
-    except KeyError as ex:
-        _LOGGER.error("Unexpected response structure from Sutro API: %s", ex)
-        raise InvalidAuth("Unexpected response structure from Sutro API") from ex
-    except Exception as ex:
-        _LOGGER.exception("Unexpected error while retrieving token: %s", ex)
-        raise InvalidAuth("Unexpected error while retrieving token") from ex
-
-    if not token:
-        raise InvalidAuth("No token returned from Sutro API")
-    return token
-
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect and retrieve a token."""
+def _stored_token(hass: HomeAssistant, data: dict[str, Any]) -> str | None:
+    """Returns the token of an entry already set up with the same credentials."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (
+            entry.data.get("username") == data["username"]
+            and entry.data.get("password") == data["password"]
+            and entry.data.get("token")
+        ):
+            return entry.data["token"]
+    return None
+
+
+async def validate_input(hass: HomeAssistant, data: dict[str, Any], token: str | None = None) -> dict[str, Any]:
+    """Validate the user input allows us to connect and retrieve a token.
+
+    A token known for the same credentials is reused when the API still
+    accepts it, otherwise a login runs, shared with any other login in flight
+    for the account.
+    """
+    session = async_get_clientsession(hass)
     try:
+        if token and await async_check_token(session, token):
+            _LOGGER.debug("Reusing the stored token for user: %s", data["username"])
+            return {"title": INTEGRATION_TITLE, "token": token}
         _LOGGER.debug("Attempting to retrieve token for user: %s", data["username"])
-        token = await hass.async_add_executor_job(get_token, data["username"], data["password"])
-    except Exception as ex:
+        token = await async_login(session, data["username"], data["password"])
+    except MySutroAuthError as ex:
+        _LOGGER.error("Failed to retrieve token: %s", ex)
+        raise InvalidAuth from ex
+    except MySutroConnectionError as ex:
         _LOGGER.error("Failed to retrieve token: %s", ex)
         raise CannotConnect from ex
     return {"title": INTEGRATION_TITLE, "token": token}
@@ -155,7 +158,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         try:
-            info = await validate_input(self.hass, user_input)
+            info = await validate_input(self.hass, user_input, _stored_token(self.hass, user_input))
         except CannotConnect:
             errors["base"] = ERROR_CANNOT_CONNECT
         except InvalidAuth:
@@ -165,17 +168,47 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors["base"] = ERROR_UNKNOWN
         else:
             # Save the username, password and token in the config entry
-            entry_data = {
+            self._entry_data = {
                 "username": user_input["username"],
                 "password": user_input["password"],
                 "token": info["token"],
             }
-            return self.async_create_entry(title=info["title"], data=entry_data)
+            self._title = info["title"]
+            gateway = MySutroGateway(async_get_clientsession(self.hass), info["token"])
+            try:
+                self._pools = await gateway.async_discover()
+            except MySutroError:
+                _LOGGER.warning("Could not discover pools, using the account's primary pool")
+                self._pools = {}
+            if len(self._pools) > 1:
+                return await self.async_step_pool()
+            return self.async_create_entry(title=self._title, data=self._entry_data)
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_pool(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Let the user pick which pool of the account this entry follows."""
+        if user_input is None:
+            choices = {
+                pool_id: pool.get("name") or f"Pool {pool_id}"
+                for pool_id, pool in self._pools.items()
+            }
+            return self.async_show_form(
+                step_id="pool",
+                data_schema=vol.Schema({vol.Required("pool_id"): vol.In(choices)}),
+            )
+
+        pool_id = user_input["pool_id"]
+        name = self._pools.get(pool_id, {}).get("name")
+        title = f"{self._title} ({name})" if name else self._title
+        return self.async_create_entry(
+            title=title, data={**self._entry_data, "pool_id": pool_id}
+        )
+
     def is_matching(self, other_flow: Any) -> bool:
         return False
 
@@ -2,12 +2,71 @@
 
 # Domain
 DOMAIN = "mysutro"
+ACCOUNTS = "accounts"  # hass.data[DOMAIN] key of the gateways shared per account
+CATALOG = "catalog"  # hass.data[DOMAIN] key of the chemical catalog shared by every entry
 
 # Update intervals and timeouts
 DEFAULT_UPDATE_INTERVAL = 30  # seconds
 MIN_UPDATE_INTERVAL = 5  # seconds
 API_TIMEOUT = 5  # seconds
 
+# Poll scheduling
+SCHEDULING_FIXED = "fixed"
+SCHEDULING_ADAPTIVE = "adaptive"
+SCHEDULING_MODES = [SCHEDULING_FIXED, SCHEDULING_ADAPTIVE]
+DEFAULT_SCHEDULING_MODE = SCHEDULING_FIXED
+ADAPTIVE_HEARTBEAT = 1800  # seconds between polls away from a test time
+ADAPTIVE_EARLY = 120  # seconds before a test time to start polling tightly
+ADAPTIVE_LATE = 1800  # seconds after a test time to keep polling tightly
+TEST_TIMES_REFRESH = 21600  # seconds between test schedule refreshes
+# Device telemetry that can be switched off, by option value
+TELEMETRY_GROUPS = {
+    "battery": ("batteryLevel",),
+    "temperature": ("temperature",),
+    "cartridge": ("cartridgeCharges",),
+    "status": ("online", "lidOpen", "lastMessage", "health"),
+}
+DEFAULT_TELEMETRY_GROUPS = list(TELEMETRY_GROUPS)
+
+BATCH_COALESCE_WINDOW = 2  # seconds a shared account fetch is reused by other entries
+
+# Seconds between refreshes of each slow-changing data tier, readings use the poll interval
+TIER_INTERVALS = {
+    "recommendations": 21600,
+    "cartridge": 86400,
+    "profile": 86400,
+    "manual": 0,  # only wanted during a reading burst, then on every poll
+}
+
+# Failure handling, per account
+API_RETRIES = 2  # extra attempts after a transient failure
+RETRY_BACKOFF_BASE = 1  # seconds, doubled on every attempt, with jitter
+RETRY_BACKOFF_CAP = 10  # seconds
+CIRCUIT_THRESHOLD = 3  # consecutive failed requests that open the circuit
+CIRCUIT_RESET_TIMEOUT = 120  # seconds before a probe request is let through
+RATE_LIMIT_RATE = 0.5  # requests per second, shared by polling, history and login
+RATE_LIMIT_BURST = 10  # requests
+STALE_DATA_MAX_AGE = 3600  # seconds the last good data is served while the API fails
+
+# Manual readings
+READING_BURST_INTERVAL = 15  # seconds between polls while a requested reading is awaited
+READING_BURST_DURATION = 900  # seconds before a burst gives up on the reading
+READING_TYPES = ["full", "partial"]
+# ManualReadingStatus values of a requested reading the API has received
+READING_LANDED_STATUSES = frozenset({"FINISHED", "READING_RECEIVED_NEEDS_REMOVAL_AND_FLUSH"})
+
+# Instrumentation
+SLOW_SECTION_THRESHOLD = 0.1  # seconds a section may hold the event loop before a warning
+SLOW_WARNING_INTERVAL = 300  # seconds between warnings about the same phase
+PROFILE_DEFAULT_DURATION = 30  # seconds
+PROFILE_MAX_DURATION = 300  # seconds
+PROFILE_TOP = 25  # functions and allocation sites listed in a report
+
+# Last known snapshot, restored at startup
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60  # seconds, coalesces writes of frequent polls
+LOGIN_TIMEOUT = 10  # seconds
+
 # User-facing strings
 INTEGRATION_NAME = "mySutro Gateway"
 INTEGRATION_TITLE = "mySutro Service"
@@ -25,8 +84,29 @@ CONTENT_TYPE = "application/json"
 DOMAIN = "mysutro"
 
 PROP_MAP = {
-    'ph': {'min': 6.0, 'max': 8.4, 'step':0.01},
-    'chlorine': {'min': 0.0, 'max': 12.0, 'step':0.1},
-    'bromine': {'min': 0.0, 'max': 10.0, 'step':0.1},
-    'alkalinity': {'min': 0.0, 'max': 300.0, 'step':0.1},
+    'ph': {'min': 6.0, 'max': 8.4, 'step':0.01, 'unit': None},
+    'chlorine': {'min': 0.0, 'max': 12.0, 'step':0.1, 'unit': 'ppm'},
+    'bromine': {'min': 0.0, 'max': 10.0, 'step':0.1, 'unit': 'ppm'},
+    'alkalinity': {'min': 0.0, 'max': 300.0, 'step':0.1, 'unit': 'ppm'},
 }
+
+# History sync
+HISTORY_PAGE_SIZE = 100  # readings per request
+HISTORY_MAX_PAGES = 50  # upper bound of requests per sync window
+HISTORY_SYNC_WINDOW = 7  # days of readings fetched, imported and checkpointed at a time
+HISTORY_RETENTION = 30  # days of history kept by the Sutro API
+
+# History export
+EXPORT_WINDOW = 7  # days of readings fetched and written at a time
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = [EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET]
+
+# Local reading store
+READING_STORE_FILE = "mysutro_readings.db"  # in .storage, shared by every entry
+READING_CACHE_SIZE = 32  # query results kept per pool
+
+# Chemical catalog
+CATALOG_STORAGE_VERSION = 1
+CATALOG_TTL = 7  # days before the stored catalog is fetched again
+CATALOG_RETRY = 3600  # seconds before a failed catalog fetch is retried
@@ -0,0 +1,42 @@
+"""Diagnostics support for the mySutro integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .trends import TREND_KEYS
+
+TO_REDACT = {"username", "password", "token"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "pool_id": coordinator.pool_id,
+        "update_interval": str(coordinator.update_interval),
+        "scheduling_mode": coordinator.scheduling_mode,
+        "last_update_success": coordinator.last_update_success,
+        "stale": coordinator.stale,
+        "reading_burst_until": coordinator.burst_until.isoformat() if coordinator.burst_until else None,
+        "data_fetched_at": coordinator.data_fetched_at.isoformat() if coordinator.data_fetched_at else None,
+        "data": coordinator.data.as_dict() if coordinator.data else None,
+        "updates": coordinator.update_stats,
+        "trends": {
+            trend_key: coordinator.trends.stats(trend_key) for trend_key in TREND_KEYS
+        },
+        "reading_store": coordinator.reading_store.as_dict(),
+        "chemical_catalog": coordinator.catalog.as_dict(),
+        "gateway": {
+            "pools": len(coordinator.gateway.pools),
+            "requests": coordinator.gateway.metrics.as_dict(),
+            "timings": coordinator.gateway.timings.as_dict(),
+            "circuit": coordinator.gateway.breaker.as_dict(),
+            "due_tiers": sorted(coordinator.gateway.due_tiers()),
+        },
+    }
@@ -0,0 +1,290 @@
+"""Streaming export of historical readings to CSV or Parquet files."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+import csv
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from .const import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    EXPORT_WINDOW,
+    HISTORY_MAX_PAGES,
+    HISTORY_PAGE_SIZE,
+    HISTORY_RETENTION,
+)
+from .gateway import MySutroError, MySutroGateway
+from .generated import HistoricalReading
+from .query import READING_FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# readingTime leads so a resumed export can find the last row cheaply
+COLUMNS = ("readingTime",) + tuple(field for field in READING_FIELDS if field != "readingTime")
+FLOAT_COLUMNS = ("ph", "chlorine", "bromine", "alkalinity", "minAlkalinity", "maxAlkalinity")
+
+# Bytes read from the end of a CSV file to find its last row
+TAIL_BYTES = 4096
+
+
+class MySutroExportError(MySutroError):
+    """Error to indicate an export could not be written."""
+
+
+def _parse_time(value: Any) -> datetime | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return _format_time(value)
+    if isinstance(value, tuple):
+        return ";".join(value)
+    return value
+
+
+@dataclass
+class ExportResult:
+    """Outcome of one export run"""
+    path: str
+    rows: int
+    first_reading: datetime | None
+    last_reading: datetime | None
+    resumed_from: datetime | None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the result in a JSON-serializable form."""
+        return {
+            "path": self.path,
+            "rows": self.rows,
+            "first_reading": self.first_reading.isoformat() if self.first_reading else None,
+            "last_reading": self.last_reading.isoformat() if self.last_reading else None,
+            "resumed_from": self.resumed_from.isoformat() if self.resumed_from else None,
+        }
+
+
+class CsvReadingWriter:
+    """Appends readings to a CSV file, one row per reading"""
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._file = None
+        self._writer = None
+
+    def last_reading_time(self) -> datetime | None:
+        """Returns the readingTime of the last row already in the file."""
+        if not self.path.exists() or not self.path.stat().st_size:
+            return None
+        with self.path.open("rb") as file:
+            file.seek(max(0, file.seek(0, os.SEEK_END) - TAIL_BYTES))
+            lines = file.read().decode("utf-8", errors="replace").splitlines()
+        for line in reversed(lines):
+            value = line.split(",", 1)[0].strip()
+            if value and value != COLUMNS[0]:
+                try:
+                    return _parse_time(value)
+                except ValueError:
+                    continue
+        return None
+
+    def open(self) -> None:
+        new_file = not self.path.exists() or not self.path.stat().st_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(COLUMNS)
+
+    def write_rows(self, readings: list[HistoricalReading]) -> None:
+        for reading in readings:
+            self._writer.writerow(_csv_value(reading.get(column)) for column in COLUMNS)
+        # Rows written so far survive an interrupted export
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetReadingWriter:
+    """Writes readings to a directory of Parquet files, one file per run
+
+    Parquet files cannot be appended to, so a resumed export adds a new part.
+    Needs pyarrow, which is imported on first use.
+    """
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._part: Path | None = None
+        self._writer = None
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel
+            import pyarrow.compute  # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        except ImportError as ex:
+            raise MySutroExportError("Parquet export needs the pyarrow package") from ex
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._schema = pyarrow.schema(
+            [("readingTime", pyarrow.timestamp("us", tz="UTC"))]
+            + [(column, pyarrow.float64()) for column in FLOAT_COLUMNS]
+            + [("invalidatingTrends", pyarrow.list_(pyarrow.string()))]
+        )
+
+    def last_reading_time(self) -> datetime | None:
+        """Returns the newest readingTime of every part already written."""
+        last = None
+        for part in sorted(self.path.glob("readings-*.parquet")):
+            column = self._pq.read_table(part, columns=["readingTime"]).column("readingTime")
+            newest = self._pa.compute.max(column).as_py() if len(column) else None
+            if newest is not None and (last is None or newest > last):
+                last = newest
+        return last
+
+    def open(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self._part = self.path / f"readings-{stamp}.parquet"
+
+    def write_rows(self, readings: list[HistoricalReading]) -> None:
+        rows = [
+            {
+                "readingTime": reading.reading_time,
+                **{column: reading.get(column) for column in FLOAT_COLUMNS},
+                "invalidatingTrends": list(reading.invalidating_trends),
+            }
+            for reading in readings
+        ]
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._part, self._schema)
+        # Every batch becomes a row group, nothing accumulates in memory
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def create_writer(path: str | os.PathLike, export_format: str) -> CsvReadingWriter | ParquetReadingWriter:
+    """Returns the writer for an export format.
+
+    Raises:
+        MySutroExportError: the format is unknown or its library is missing
+    """
+    if export_format == EXPORT_FORMAT_CSV:
+        return CsvReadingWriter(path)
+    if export_format == EXPORT_FORMAT_PARQUET:
+        return ParquetReadingWriter(path)
+    raise MySutroExportError(f"Unknown export format {export_format}")
+
+
+async def async_iter_readings(
+    gateway: MySutroGateway, pool_id: str, start: datetime, end: datetime
+) -> AsyncIterator[list[HistoricalReading]]:
+    """Yields a pool's readings between start and end, oldest first, a window at a time.
+
+    The range is walked forward in EXPORT_WINDOW chunks. A chunk is paged
+    backwards like the API returns it and yielded in chronological order, so
+    memory is bounded by one chunk whatever the range.
+    """
+    window_start = start
+    last_yielded: datetime | None = None
+    while window_start < end:
+        window_end = min(end, window_start + timedelta(days=EXPORT_WINDOW))
+        readings: list[HistoricalReading] = []
+        page_end = window_end
+        for _ in range(HISTORY_MAX_PAGES):
+            page = await gateway.async_get_historical_readings(
+                pool_id, _format_time(window_start), _format_time(page_end), HISTORY_PAGE_SIZE
+            )
+            readings.extend(reading for reading in page if reading.reading_time)
+            if len(page) < HISTORY_PAGE_SIZE or not readings:
+                break
+            page_end = min(reading.reading_time for reading in readings) - timedelta(seconds=1)
+            if page_end < window_start:
+                break
+        else:
+            _LOGGER.warning("Export window at %s stopped after %d pages", window_start, HISTORY_MAX_PAGES)
+        # Neighbouring windows share their boundary instant, a reading on it was yielded already
+        fresh = {
+            reading.reading_time: reading for reading in readings
+            if last_yielded is None or reading.reading_time > last_yielded
+        }
+        if fresh:
+            batch = sorted(fresh.values(), key=lambda reading: reading.reading_time)
+            last_yielded = batch[-1].reading_time
+            yield batch
+        window_start = window_end
+
+
+async def _run_inline(func: Callable[..., Any], *args: Any) -> Any:
+    return func(*args)
+
+
+async def async_export_readings(
+    gateway: MySutroGateway,
+    pool_id: str,
+    writer: CsvReadingWriter | ParquetReadingWriter,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    run_blocking: Callable[..., Awaitable[Any]] = _run_inline,
+) -> ExportResult:
+    """Streams a pool's readings into a writer, resuming after its last row.
+
+    Args:
+        start: oldest reading to export, defaults to the API's retention window
+        end: newest reading to export, defaults to now
+        run_blocking: runs file I/O off the event loop, e.g. hass.async_add_executor_job
+
+    Raises:
+        MySutroError: the readings could not be fetched or written
+    """
+    now = datetime.now(timezone.utc)
+    end = end or now
+    start = start or now - timedelta(days=HISTORY_RETENTION)
+    resumed_from = await run_blocking(writer.last_reading_time)
+    if resumed_from is not None and resumed_from >= start:
+        start = resumed_from
+    result = ExportResult(str(writer.path), 0, None, None, resumed_from)
+    _LOGGER.debug("Exporting readings of pool %s from %s to %s", pool_id, start, end)
+
+    try:
+        await run_blocking(writer.open)
+    except OSError as ex:
+        raise MySutroExportError(f"Could not open {writer.path}: {ex}") from ex
+    try:
+        async for readings in async_iter_readings(gateway, pool_id, start, end):
+            if resumed_from is not None:
+                readings = [
+                    reading for reading in readings
+                    if reading.reading_time > resumed_from
+                ]
+            if not readings:
+                continue
+            try:
+                await run_blocking(writer.write_rows, readings)
+            except OSError as ex:
+                raise MySutroExportError(f"Could not write {writer.path}: {ex}") from ex
+            result.rows += len(readings)
+            result.first_reading = result.first_reading or readings[0].reading_time
+            result.last_reading = readings[-1].reading_time
+    finally:
+        await run_blocking(writer.close)
+    _LOGGER.info("Exported %d reading(s) to %s", result.rows, writer.path)
+    return result
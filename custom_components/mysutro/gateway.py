@@ -1,98 +1,640 @@
 """" Defines the gateway class for the sutro device """
 
 
+from collections.abc import Callable
 from typing import Any
+import asyncio
 import logging
-import requests
-from .const import API_ENDPOINT, USER_AGENT, CONTENT_TYPE, INTEGRATION_NAME, API_TIMEOUT
+import re
+import time
+
+import aiohttp
+
+try:
+    # Home Assistant ships orjson, which parses large history pages several times faster
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - standalone scripts without orjson
+    from json import loads as json_loads
+
+from .const import (
+    API_ENDPOINT,
+    USER_AGENT,
+    CONTENT_TYPE,
+    INTEGRATION_NAME,
+    API_TIMEOUT,
+    API_RETRIES,
+    CIRCUIT_RESET_TIMEOUT,
+    CIRCUIT_THRESHOLD,
+    LOGIN_TIMEOUT,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_RATE,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_CAP,
+    TIER_INTERVALS,
+)
+from .generated import Chemical, HistoricalReading, decode_chemicals, decode_historical_readings
+from .metrics import PhaseTimings, RequestMetrics
+from .models import PoolSnapshot
+from .query import ALL_FIELDS, READING_FIELDS, compile_pools_query, pool_alias, wanted_tiers
+from .resilience import CircuitBreaker, TokenBucket, backoff_delay
 
 
 _LOGGER = logging.getLogger(__name__)
 
+DISCOVERY_QUERY = (
+    "query { me { pool { id name device { id serialNumber } } "
+    "homes { id pools { id name device { id serialNumber } } } } }"
+)
+
+HISTORICAL_READINGS_QUERY = (
+    "query ($poolId: Int!, $startDate: DateTime, $endDate: DateTime, $limit: Int) { "
+    "getPool(poolId: $poolId) { historicalReadings(startDate: $startDate, "
+    "endDate: $endDate, limit: $limit, excludeDuplicates: true) { "
+    "count readings { " + " ".join(READING_FIELDS) + " } } } }"
+)
+
+TEST_TIMES_QUERY = (
+    "query ($deviceId: ID) { getRecurringTestTimes(deviceId: $deviceId) { hours status } "
+    "getCurrentTestTimes(deviceId: $deviceId) { hours status } }"
+)
+
+# The whole product catalog, it changes rarely and is cached by catalog.py
+CHEMICALS_QUERY = (
+    "query { chemicals { id name upc types manufacturer packageSize packageSizeUnit generic } }"
+)
+
+TRIGGER_READING_MUTATION = (
+    "mutation ($deviceId: Int, $readingType: ReadingType!) { "
+    "triggerReading(deviceId: $deviceId, readingType: $readingType) }"
+)
+
+# Cheapest authenticated query, used to check a stored token is still accepted
+ME_QUERY = "query { me { id } }"
+
+LOGIN_MUTATION = (
+    "mutation ($email: String!, $password: String!) { "
+    "login(email: $email, password: $password) { "
+    "user { firstName lastName email phone releaseGroup __typename } "
+    "token __typename } }"
+)
+
+
+class MySutroError(Exception):
+    """Base error raised by the gateway."""
+
+
+class MySutroConnectionError(MySutroError):
+    """Error to indicate the Sutro API could not be reached."""
+
+
+class MySutroAuthError(MySutroError):
+    """Error to indicate the Sutro API rejected the credentials."""
+
+
+class MySutroCircuitOpenError(MySutroConnectionError):
+    """Error to indicate requests are held back after repeated failures."""
+
+
+def _base_headers() -> dict[str, str]:
+    """Headers sent with every request, compressed responses are requested."""
+    return {
+        "Content-Type": CONTENT_TYPE,
+        "User-Agent": USER_AGENT,
+        "Accept": "*/*",
+        "Accept-Encoding": "gzip, deflate",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+
+
+async def async_get_token(
+    session: aiohttp.ClientSession,
+    username: str,
+    password: str,
+    endpoint: str = API_ENDPOINT,
+) -> str:
+    """Perform the login mutation to retrieve a token from the Sutro API."""
+    payload = {
+        "operationName": None,
+        "variables": {
+            "email": username,
+            "password": password,
+            "focusedInput": "",
+            "loading": False
+        },
+        "query": LOGIN_MUTATION,
+    }
+
+    try:
+        _LOGGER.debug("Sending login request to Sutro API")
+        async with session.post(
+            endpoint,
+            json=payload,
+            headers=_base_headers(),
+            timeout=aiohttp.ClientTimeout(total=LOGIN_TIMEOUT),
+        ) as resp:
+            resp.raise_for_status()
+            _LOGGER.debug("Login request successful, parsing response")
+            data = await resp.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+        _LOGGER.error("Failed to connect to Sutro API: %s", ex)
+        raise MySutroConnectionError(f"Login failed: {ex}") from ex
+    except ValueError as ex:
+        _LOGGER.error("Failed to parse response from Sutro API: %s", ex)
+        raise MySutroAuthError("Invalid response from Sutro API") from ex
+
+    login = ((data or {}).get("data") or {}).get("login") or {}
+    token = login.get("token")
+    if not token:
+        raise MySutroAuthError("No token returned from Sutro API")
+    return token
+
+
+# (endpoint, username, password) -> login in flight, shared by gateways and flows
+_LOGINS: dict[tuple[str, str, str], asyncio.Task] = {}
+
+
+async def async_login(
+    session: aiohttp.ClientSession,
+    username: str,
+    password: str,
+    endpoint: str = API_ENDPOINT,
+) -> str:
+    """Logs in, concurrent callers for the same account share one login.
+
+    Raises:
+        MySutroAuthError: the credentials were rejected
+        MySutroConnectionError: the Sutro API could not be reached
+    """
+    key = (endpoint, username, password)
+    task = _LOGINS.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(
+            async_get_token(session, username, password, endpoint)
+        )
+        _LOGINS[key] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if _LOGINS.get(key) is done:
+                del _LOGINS[key]
+
+        task.add_done_callback(_forget)
+    else:
+        _LOGGER.debug("Joining the login in flight for %s", username)
+    # A cancelled caller must not cancel the login the others wait for
+    return await asyncio.shield(task)
+
+
+async def async_check_token(
+    session: aiohttp.ClientSession,
+    token: str,
+    endpoint: str = API_ENDPOINT,
+) -> bool:
+    """Returns true when the Sutro API still accepts a token.
+
+    Raises:
+        MySutroConnectionError: the Sutro API could not be reached
+    """
+    headers = _base_headers()
+    headers["Authorization"] = "Bearer " + token
+    try:
+        async with session.post(
+            endpoint,
+            json={"query": ME_QUERY},
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=LOGIN_TIMEOUT),
+        ) as resp:
+            status = resp.status
+            try:
+                data = await resp.json(content_type=None) or {}
+            except ValueError:
+                data = {}
+    except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+        raise MySutroConnectionError(f"Token check failed: {ex}") from ex
+    if _is_auth_failure(status, data):
+        return False
+    if status >= 400:
+        raise MySutroConnectionError(f"Sutro API returned status {status}")
+    return bool(((data.get("data") or {}).get("me") or {}).get("id"))
+
+
+# Only token expiry counts, an expired recommendation or treatment is not an auth failure
+AUTH_ERROR_MARKERS = (
+    "unauthorized", "unauthenticated", "not authorized", "invalid token", "token expired", "jwt expired",
+)
+AUTH_ERROR_CODES = ("UNAUTHENTICATED",)
+
+
+def _is_auth_failure(status: int, body: dict[str, Any]) -> bool:
+    """Returns true when a response says the token was rejected."""
+    if status in (401, 403):
+        return True
+    for error in body.get("errors") or []:
+        error = error or {}
+        if (error.get("extensions") or {}).get("code") in AUTH_ERROR_CODES:
+            return True
+        message = str(error.get("message", "")).lower()
+        if any(marker in message for marker in AUTH_ERROR_MARKERS):
+            return True
+    return False
+
+
+# Statuses worth another attempt, the API is overloaded or restarting
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _graphql_error(body: dict[str, Any]) -> str | None:
+    """Returns the first GraphQL error message of a response without data."""
+    errors = body.get("errors")
+    if not errors or body.get("data"):
+        return None
+    return str((errors[0] or {}).get("message") or "GraphQL error")
+
+
+ROOT_FIELD_RE = re.compile(r"\{\s*(\w+)")
+
+
+def _operation_label(query: str) -> str:
+    """Labels an anonymous operation by its first root field, for metrics."""
+    match = ROOT_FIELD_RE.search(query)
+    return match.group(1) if match else "query"
 
 
 class MySutroGateway:
     """Gateway object to communicate with sutro service
-    
+
+    One gateway is shared by every config entry of an account. It discovers the
+    account's pools and fetches all of them with a single aliased request;
+    concurrent refreshes are coalesced onto the request already in flight.
+    Slow-changing tiers ride along in the same request only when they are due.
+    Every request and login of the account draws from one rate budget, and a
+    circuit breaker holds requests back while the API keeps failing.
+
     Args:
+        session (aiohttp.ClientSession): shared client session, keeps connections warm
         token (str): the token to authenticate with the server
+        username (str): optional login, used to replace a rejected token
+        password (str): optional password, used to replace a rejected token
+        on_token_refresh (Callable): called with the new token after a login
     """
-    def __init__(self, token: str) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        token: str,
+        username: str | None = None,
+        password: str | None = None,
+        on_token_refresh: Callable[[str], None] | None = None,
+    ) -> None:
+        self.session = session
         self.token = token
+        self.username = username
+        self.password = password
+        self.on_token_refresh = on_token_refresh
+        self._login_task: asyncio.Task | None = None
+        self.metrics = RequestMetrics()
+        self.timings = PhaseTimings()
+        self.breaker = CircuitBreaker(CIRCUIT_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+        self.rate_limit = TokenBucket(RATE_LIMIT_RATE, RATE_LIMIT_BURST)
         self.api_endpoint = API_ENDPOINT
-        self.sutro_state = ""
+        self.pools: dict[str, dict[str, Any]] = {}
+        self.primary_pool_id: str | None = None
+        self.pool_data: dict[str, PoolSnapshot] = {}
+        self.last_update: float | None = None
+        self._update_task: asyncio.Task | None = None
+        self._fields: dict[str, frozenset[str] | None] = {}
+        self._tier_updated: dict[str, float] = {}
         _LOGGER.debug("Initialized MySutroGateway with token: %s", token[:6] + "..." if token else None)
 
-    def update(self) -> None:
+    async def async_discover(self) -> dict[str, dict[str, Any]]:
+        """Finds every pool (and its device) on the account.
+
+        Raises:
+            MySutroError: the response did not describe the account
+        """
+        result_json = await self.async_api_request(DISCOVERY_QUERY)
+        try:
+            me = result_json['data']['me']
+        except (KeyError, TypeError) as e:
+            raise MySutroError("No account in discovery response") from e
+
+        pools: dict[str, dict[str, Any]] = {}
+        candidates = [me.get("pool")]
+        for home in me.get("homes") or []:
+            candidates.extend((home or {}).get("pools") or [])
+        for pool in candidates:
+            if pool and pool.get("id") is not None:
+                pools.setdefault(str(pool["id"]), pool)
+
+        self.pools = pools
+        primary = me.get("pool") or {}
+        self.primary_pool_id = str(primary["id"]) if primary.get("id") is not None else next(iter(pools), None)
+        _LOGGER.debug("Discovered %d pool(s), primary %s", len(pools), self.primary_pool_id)
+        return pools
+
+    def device_id(self, pool_id: str) -> str | None:
+        """Returns the id of the device attached to a pool, if any."""
+        device = self.pools.get(pool_id, {}).get("device") or {}
+        return device.get("id")
+
+    def set_fields(self, consumer: str, fields: frozenset[str] | None) -> None:
+        """Registers the fields a consumer reads, None asks for every field."""
+        self._fields[consumer] = fields
+
+    def refresh_tiers(self, *tiers: str) -> None:
+        """Makes tiers due on the next fetch, every tier when none is given."""
+        for tier in tiers or tuple(self._tier_updated):
+            self._tier_updated.pop(tier, None)
+
+    def remove_fields(self, consumer: str) -> None:
+        """Forgets the fields registered by a consumer."""
+        self._fields.pop(consumer, None)
+
+    @property
+    def query_fields(self) -> frozenset[str]:
+        """Union of the fields every consumer needs."""
+        if not self._fields or any(fields is None for fields in self._fields.values()):
+            return ALL_FIELDS
+        return frozenset().union(*self._fields.values())
+
+    def due_tiers(self) -> frozenset[str]:
+        """Returns the wanted tiers whose refresh interval has passed."""
+        now = time.monotonic()
+        return frozenset(
+            tier for tier in wanted_tiers(self.query_fields)
+            if tier not in self._tier_updated or now - self._tier_updated[tier] >= TIER_INTERVALS[tier]
+        )
+
+    async def async_update(self, max_age: float = 0) -> None:
         """Called when an update is requested by HASS
+
+        Callers arriving while a fetch is in flight share its result, and data
+        younger than max_age seconds is reused as is.
         """
-        _LOGGER.debug("Calling update on MySutroGateway")
-        result_json = self.api_request()
-        _LOGGER.debug("API request result: %s", result_json)
-        if result_json != "":
-            try:
-                self.sutro_state = result_json['data']['me']['pool']['latestReading']
-                _LOGGER.debug("Updated sutro_state: %s", self.sutro_state)
-            except Exception as e:
-                _LOGGER.error("Failed to update sutro_state: %s", e)
+        if self._update_task is None:
+            if self.last_update is not None and time.monotonic() - self.last_update < max_age:
+                return
+            self._update_task = asyncio.get_running_loop().create_task(self._async_fetch_pools())
+            self._update_task.add_done_callback(self._update_done)
+        await asyncio.shield(self._update_task)
+
+    def _update_done(self, task: asyncio.Task) -> None:
+        self._update_task = None
+
+    async def _async_fetch_pools(self) -> None:
+        """Fetches every known pool in one round trip.
+
+        Raises:
+            MySutroError: the request failed or returned no pools
+        """
+        if not self.pools:
+            await self.async_discover()
+        _LOGGER.debug("Calling update on MySutroGateway for %d pool(s)", len(self.pools))
+        tiers = self.due_tiers()
+        compiled = compile_pools_query(tuple(self.pools), self.query_fields, tiers)
+        with self.timings.span("fetch", blocking=False):
+            result_json = await self.async_api_request(
+                compiled.document,
+                operation_name=compiled.operation_name,
+                extensions=compiled.extensions,
+            )
+        data = (result_json or {}).get("data") or {}
+        new_reading = False
+        with self.timings.span("decode"):
+            for pool_id in self.pools:
+                pool = data.get(pool_alias(pool_id))
+                if pool is not None:
+                    previous = self.pool_data.get(pool_id)
+                    # Decoded once here, entities only read attributes
+                    snapshot = PoolSnapshot.from_pool(pool_id, pool, tiers, previous)
+                    self.pool_data[pool_id] = snapshot
+                    new_reading |= previous is not None and snapshot.reading_time != previous.reading_time
+        if not data:
+            raise MySutroError("No pools in response")
+        self.last_update = time.monotonic()
+        for tier in tiers:
+            self._tier_updated[tier] = self.last_update
+        if new_reading and "recommendations" not in tiers:
+            # SutroAI advises on every reading, pick the new advice up on the next poll
+            self.refresh_tiers("recommendations")
 
-    def api_request(self) -> dict[str, Any]:
-        """Sends a request to the sutro API.  Currently just loads the status   .
+    async def async_api_request(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+        extensions: dict[str, Any] | None = None,
+        retries: int = API_RETRIES,
+    ) -> dict[str, Any]:
+        """Sends a request to the sutro API.
+
+        Transient failures are retried with jittered exponential backoff, up
+        to `retries` times, a rejected token is replaced once.
 
         Returns:
-            str: The result from the query as JSON
+            dict: The result from the query as JSON
+
+        Raises:
+            MySutroCircuitOpenError: requests are held back after repeated failures
+            MySutroConnectionError: the API could not be reached
+            MySutroAuthError: the token was rejected and could not be replaced
+            MySutroError: the API answered with an error
         """
-        args = {}
-        req_data = """
-        {
-            "query": "query { 
-                me { 
-                    pool { 
-                        latestReading { 
-                            alkalinity 
-                            bromine 
-                            chlorine 
-                            ph 
-                            minAlkalinity 
-                            maxAlkalinity 
-                            readingTime 
-                            invalidatingTrends 
-                        } 
-                    } 
-                } 
-            }"
-        }
-        """.replace("\n", "").replace("  ", "")
-        req_headers = {
-            "Content-Type": CONTENT_TYPE,
-            "User-Agent": USER_AGENT,
-            "Authorization": "Bearer " + self.token
-        }
-        _LOGGER.debug("Sending POST to %s with headers: %s and data: %s",
-                        self.api_endpoint,
-                        req_headers,
-                        req_data)
-        try:
-            ret = requests.post(
-                self.api_endpoint,
-                params=args,
-                timeout=API_TIMEOUT,
-                data=req_data,
-                headers=req_headers
+        payload: dict[str, Any] = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        if operation_name:
+            payload["operationName"] = operation_name
+        if extensions:
+            payload["extensions"] = extensions
+        operation = operation_name or _operation_label(query)
+        _LOGGER.debug("Sending POST to %s with query: %s", self.api_endpoint, operation_name or query)
+        if not self.breaker.allow():
+            self.metrics.record_rejected()
+            raise MySutroCircuitOpenError(
+                f"Sutro API unavailable, retrying in {self.breaker.retry_after:.0f} s"
             )
-            ret.raise_for_status()
-            ret_json = ret.json()
-            _LOGGER.debug("Received response: %s", ret_json)
-            return ret_json
-        except Exception as e:
-            _LOGGER.error("API request failed: %s", e)
-            return {}
+        try:
+            ret_json = await self._async_request_with_retries(payload, operation, retries)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except MySutroConnectionError as e:
+            self.breaker.record_failure()
+            self.metrics.record_failure(e)
+            _LOGGER.warning("API request failed: %s", e)
+            raise
+        except MySutroError as e:
+            # The API answered, it is reachable
+            self.breaker.record_success()
+            self.metrics.record_failure(e)
+            _LOGGER.warning("API request failed: %s", e)
+            raise
+        self.breaker.record_success()
+        self.metrics.record_success()
+        _LOGGER.debug("Received response from %s", self.api_endpoint)
+        return ret_json
+
+    async def _async_request_with_retries(
+        self, payload: dict[str, Any], operation: str, retries: int = API_RETRIES
+    ) -> dict[str, Any]:
+        attempt = 0
+        refreshed = False
+        while True:
+            token = self.token
+            try:
+                status, ret_json = await self._async_post(payload, token, operation)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error: MySutroError = MySutroConnectionError(f"Could not reach Sutro API: {e!r}")
+            else:
+                if _is_auth_failure(status, ret_json):
+                    if refreshed or not self.can_login:
+                        raise MySutroAuthError("Token rejected by Sutro API")
+                    _LOGGER.debug("Token rejected by Sutro API, logging in again")
+                    await self.async_refresh_token(token)
+                    refreshed = True
+                    self.metrics.record_retry()
+                    continue
+                if status in TRANSIENT_STATUSES:
+                    error = MySutroConnectionError(f"Sutro API returned status {status}")
+                elif status >= 400:
+                    raise MySutroError(f"Sutro API returned status {status}")
+                elif (message := _graphql_error(ret_json)) is not None:
+                    raise MySutroError(f"Sutro API returned an error: {message}")
+                else:
+                    return ret_json
+            if attempt >= retries:
+                raise error
+            delay = backoff_delay(attempt, RETRY_BACKOFF_BASE, RETRY_BACKOFF_CAP)
+            _LOGGER.debug("%s, retrying in %.1f s", error, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+            self.metrics.record_retry()
+
+    async def _async_post(
+        self, payload: dict[str, Any], token: str, operation: str
+    ) -> tuple[int, dict[str, Any]]:
+        """Posts one request, returning the status and the decoded body."""
+        self.metrics.record_throttle(await self.rate_limit.async_acquire())
+        req_headers = _base_headers()
+        req_headers["Authorization"] = "Bearer " + token
+        started = time.monotonic()
+        async with self.session.post(
+            self.api_endpoint,
+            json=payload,
+            headers=req_headers,
+            timeout=aiohttp.ClientTimeout(total=API_TIMEOUT),
+        ) as ret:
+            body = await ret.read()
+        self.metrics.record_response(operation, ret.status, time.monotonic() - started, len(body))
+        try:
+            with self.timings.span("parse"):
+                ret_json = json_loads(body) if body else {}
+        except ValueError:
+            ret_json = {}
+        return ret.status, ret_json or {}
 
     @property
-    def data(self) -> str:
-        """ Returns the last data retrieved with the update method """
-        _LOGGER.debug("Accessing sutro_state: %s", self.sutro_state)
-        return self.sutro_state
+    def can_login(self) -> bool:
+        """True when stored credentials allow logging in again."""
+        return bool(self.username and self.password)
+
+    async def async_refresh_token(self, rejected_token: str | None = None) -> str:
+        """Logs in again with the stored credentials.
+
+        Concurrent callers share one in-flight login, and a caller whose token
+        was already replaced gets the new one without another login.
+
+        Raises:
+            MySutroError: the login failed
+        """
+        if rejected_token is not None and rejected_token != self.token:
+            return self.token
+        if self._login_task is None:
+            self._login_task = asyncio.get_running_loop().create_task(self._async_login())
+            # Cleared however it ends, even when every waiting caller was cancelled
+            self._login_task.add_done_callback(self._login_done)
+        return await asyncio.shield(self._login_task)
+
+    def _login_done(self, task: asyncio.Task) -> None:
+        if self._login_task is task:
+            self._login_task = None
+
+    async def _async_login(self) -> str:
+        """Logs in within the account's rate budget and adopts the new token."""
+        self.metrics.record_throttle(await self.rate_limit.async_acquire())
+        token = await async_login(self.session, self.username, self.password, self.api_endpoint)
+        if token != self.token:
+            self.token = token
+            _LOGGER.info("Refreshed the Sutro API token")
+            if self.on_token_refresh is not None:
+                self.on_token_refresh(token)
+        return token
+
+    async def async_get_historical_readings(
+        self, pool_id: str, start: str, end: str, limit: int
+    ) -> list[HistoricalReading]:
+        """Returns one page of a pool's readings between start and end, newest first.
+
+        Raises:
+            MySutroError: the response did not contain a readings page
+        """
+        result_json = await self.async_api_request(
+            HISTORICAL_READINGS_QUERY,
+            {"poolId": int(pool_id), "startDate": start, "endDate": end, "limit": limit},
+        )
+        try:
+            return decode_historical_readings(result_json)
+        except (KeyError, TypeError, ValueError) as e:
+            raise MySutroError("No historical readings in response") from e
+
+    async def async_trigger_reading(self, pool_id: str, reading_type: str = "FULL") -> str | None:
+        """Asks a pool's device to take a reading now.
+
+        The mutation is not retried on transient failures, a retry could
+        start a second reading.
+
+        Raises:
+            MySutroError: the request failed
+        """
+        device_id = self.device_id(pool_id)
+        variables: dict[str, Any] = {"readingType": reading_type}
+        if device_id is not None:
+            variables["deviceId"] = int(device_id)
+        result_json = await self.async_api_request(TRIGGER_READING_MUTATION, variables, retries=0)
+        return ((result_json or {}).get("data") or {}).get("triggerReading")
+
+    async def async_get_chemicals(self) -> list[Chemical]:
+        """Returns every chemical product the Sutro app knows.
+
+        Raises:
+            MySutroError: the response did not contain the catalog
+        """
+        result_json = await self.async_api_request(CHEMICALS_QUERY)
+        try:
+            return decode_chemicals(result_json)
+        except (KeyError, TypeError, ValueError) as e:
+            raise MySutroError("No chemicals in response") from e
+
+    async def async_get_test_times(self, device_id: str | None = None) -> list[int]:
+        """Returns the hours of day a device is scheduled to take readings.
+
+        The recurring schedule includes pending changes and is preferred over
+        the current one.
+
+        Raises:
+            MySutroError: the response did not contain a schedule
+        """
+        result_json = await self.async_api_request(
+            TEST_TIMES_QUERY, {"deviceId": device_id} if device_id else None
+        )
+        try:
+            data = result_json['data']
+        except (KeyError, TypeError) as e:
+            raise MySutroError("No test times in response") from e
+        for field in ("getRecurringTestTimes", "getCurrentTestTimes"):
+            hours = (data.get(field) or {}).get("hours")
+            if hours:
+                return sorted({int(hour) for hour in hours if hour is not None})
+        return []
 
     @property
     def name(self) -> str:
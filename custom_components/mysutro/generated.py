@@ -0,0 +1,187 @@
+"""Typed decoders generated from the Sutro GraphQL schema.
+
+Generated by .scripts/generate_models.py from custom_components/scripts/schema.graphql,
+do not edit by hand. Run the script again after changing a query document.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+SCHEMA_SHA256 = "e18292514a0515587fec503b3f29a2986ece5d24dc134bf50b78db00b6c11b0c"
+
+# Query document constant -> sha256 of the document validated against the schema
+DOCUMENT_SHA256 = {
+    "CHEMICALS_QUERY": "78e2b04e20f3f9714c9fdd110f410f71e6bb038b09f3640a412c35f207aa8aec",
+    "DISCOVERY_QUERY": "1322ca8c1ae03b3f578dd1a4ab1f684ffb2b93c8a96757448a059c54a5f1cf74",
+    "HISTORICAL_READINGS_QUERY": "b30fb0adb47119b5516c2f24a4adc0043d1d838890e6cc5eb207a60ed178c0f8",
+    "LOGIN_MUTATION": "cf337903a199793c043bcbbb04f429d521f580abfd60bc5ed97785b58fa402f4",
+    "ME_QUERY": "9e953a2bc24f8e4d55622dfcaf30d438f918454244660a381b18a5b5e34bb41e",
+    "POOLS_QUERY": "356df563ffe831c6fe171c75771fcb2f5b6d25405967aea06850ace21c257779",
+    "TEST_TIMES_QUERY": "a50233b1cce511b566bedc4b2862b784d330af24310f3b605474f933a803a13c",
+    "TRIGGER_READING_MUTATION": "579fc843b9fe7649e010e6eda6b3ce7c910be74f9337556408129e142120c70d",
+}
+
+
+def _float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def _int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+def _bool(value: Any) -> bool | None:
+    return None if value is None else bool(value)
+
+
+def _str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _any(value: Any) -> Any:
+    return value
+
+
+def _datetime(value: Any) -> datetime | None:
+    # The API sends ISO-8601 with a Z suffix, which fromisoformat accepts
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _tuple(value: Any, decode) -> tuple:
+    return tuple(decode(item) for item in value or () if item is not None)
+
+
+@dataclass(frozen=True, slots=True)
+class HistoricalReading:
+    """One item of getPool.historicalReadings.readings selected by HISTORICAL_READINGS_QUERY"""
+    alkalinity: float | None = None
+    bromine: float | None = None
+    chlorine: float | None = None
+    ph: float | None = None
+    min_alkalinity: float | None = None
+    max_alkalinity: float | None = None
+    reading_time: datetime | None = None
+    invalidating_trends: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> HistoricalReading:
+        """Decodes one item keyed by API field names."""
+        return cls(
+            alkalinity=_float(raw.get("alkalinity")),
+            bromine=_float(raw.get("bromine")),
+            chlorine=_float(raw.get("chlorine")),
+            ph=_float(raw.get("ph")),
+            min_alkalinity=_float(raw.get("minAlkalinity")),
+            max_alkalinity=_float(raw.get("maxAlkalinity")),
+            reading_time=_datetime(raw.get("readingTime")),
+            invalidating_trends=_tuple(raw.get("invalidatingTrends"), _str),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns a value by its API field name, like dict.get."""
+        attribute = HISTORICAL_READING_ATTRIBUTES.get(key)
+        return default if attribute is None else getattr(self, attribute)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the item keyed by API field names, datetimes as ISO strings."""
+        return {
+            "alkalinity": self.alkalinity,
+            "bromine": self.bromine,
+            "chlorine": self.chlorine,
+            "ph": self.ph,
+            "minAlkalinity": self.min_alkalinity,
+            "maxAlkalinity": self.max_alkalinity,
+            "readingTime": self.reading_time.isoformat() if self.reading_time else None,
+            "invalidatingTrends": list(self.invalidating_trends),
+        }
+
+
+HISTORICAL_READING_ATTRIBUTES = {
+    "alkalinity": "alkalinity",
+    "bromine": "bromine",
+    "chlorine": "chlorine",
+    "ph": "ph",
+    "minAlkalinity": "min_alkalinity",
+    "maxAlkalinity": "max_alkalinity",
+    "readingTime": "reading_time",
+    "invalidatingTrends": "invalidating_trends",
+}
+
+
+def decode_historical_readings(result: dict[str, Any]) -> list[HistoricalReading]:
+    """Decodes getPool.historicalReadings.readings of a HISTORICAL_READINGS_QUERY response.
+
+    Raises:
+        KeyError, TypeError: the response does not hold the selection
+    """
+    items = result["data"]["getPool"]["historicalReadings"]["readings"]
+    return [HistoricalReading.from_dict(item) for item in items if item]
+
+
+@dataclass(frozen=True, slots=True)
+class Chemical:
+    """One item of chemicals selected by CHEMICALS_QUERY"""
+    id: str | None = None
+    name: str | None = None
+    upc: str | None = None
+    types: tuple[str, ...] = ()
+    manufacturer: str | None = None
+    package_size: str | None = None
+    package_size_unit: str | None = None
+    generic: bool | None = None
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> Chemical:
+        """Decodes one item keyed by API field names."""
+        return cls(
+            id=_str(raw.get("id")),
+            name=_str(raw.get("name")),
+            upc=_str(raw.get("upc")),
+            types=_tuple(raw.get("types"), _str),
+            manufacturer=_str(raw.get("manufacturer")),
+            package_size=_str(raw.get("packageSize")),
+            package_size_unit=_str(raw.get("packageSizeUnit")),
+            generic=_bool(raw.get("generic")),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns a value by its API field name, like dict.get."""
+        attribute = CHEMICAL_ATTRIBUTES.get(key)
+        return default if attribute is None else getattr(self, attribute)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the item keyed by API field names, datetimes as ISO strings."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "upc": self.upc,
+            "types": list(self.types),
+            "manufacturer": self.manufacturer,
+            "packageSize": self.package_size,
+            "packageSizeUnit": self.package_size_unit,
+            "generic": self.generic,
+        }
+
+
+CHEMICAL_ATTRIBUTES = {
+    "id": "id",
+    "name": "name",
+    "upc": "upc",
+    "types": "types",
+    "manufacturer": "manufacturer",
+    "packageSize": "package_size",
+    "packageSizeUnit": "package_size_unit",
+    "generic": "generic",
+}
+
+
+def decode_chemicals(result: dict[str, Any]) -> list[Chemical]:
+    """Decodes chemicals of a CHEMICALS_QUERY response.
+
+    Raises:
+        KeyError, TypeError: the response does not hold the selection
+    """
+    items = result["data"]["chemicals"]
+    return [Chemical.from_dict(item) for item in items if item]
@@ -0,0 +1,231 @@
+"""Incremental sync of mySutro readings into Home Assistant long-term statistics."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    HISTORY_MAX_PAGES,
+    HISTORY_PAGE_SIZE,
+    HISTORY_RETENTION,
+    HISTORY_SYNC_WINDOW,
+    PROP_MAP,
+)
+from .gateway import MySutroError, MySutroGateway
+from .generated import HistoricalReading
+from .reading_store import MySutroReadingStore
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def _format_time(value: datetime) -> str:
+    """Formats a datetime the way the Sutro API expects it."""
+    return dt_util.as_utc(value).isoformat().replace("+00:00", "Z")
+
+
+def _hour_start(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+class MySutroHistorySync:
+    """Imports readings newer than a persisted high-water mark as external statistics
+
+    Args:
+        hass (HomeAssistant): the running instance
+        entry (ConfigEntry): the entry the readings belong to
+        gateway (MySutroGateway): gateway used to query historicalReadings
+        pool_id (str): the pool whose readings are imported
+        reading_store (MySutroReadingStore): local store also fed the fetched readings
+    """
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        gateway: MySutroGateway,
+        pool_id: str,
+        reading_store: MySutroReadingStore | None = None,
+    ) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.gateway = gateway
+        self.pool_id = pool_id
+        self.reading_store = reading_store
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.history"
+        )
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.high_water_mark: datetime | None = None
+
+    def statistic_id(self, key: str) -> str:
+        """Returns the external statistic id used for a reading key."""
+        return f"{DOMAIN}:{self.entry.entry_id.lower()}_{key}"
+
+    async def async_load(self) -> None:
+        """Restores the high-water mark from storage."""
+        stored = await self._store.async_load()
+        if stored and stored.get("high_water_mark"):
+            self.high_water_mark = dt_util.parse_datetime(stored["high_water_mark"])
+
+    @callback
+    def async_check_reading(self, latest: datetime | None) -> None:
+        """Schedules a sync when the latest reading is newer than the high-water mark."""
+        if latest is None or (self._task and not self._task.done()):
+            return
+        if self.high_water_mark is not None and latest <= self.high_water_mark:
+            return
+        self.async_schedule_sync()
+
+    @callback
+    def async_schedule_sync(self) -> None:
+        """Runs a sync in the background unless one is already running."""
+        if self._task and not self._task.done():
+            return
+        self._task = self.entry.async_create_background_task(
+            self.hass, self._async_run_sync(), f"{DOMAIN}_history_sync"
+        )
+
+    async def async_wait_sync(self) -> None:
+        """Waits for the running sync, if any, its failures are logged by the sync."""
+        if self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def _async_run_sync(self) -> None:
+        try:
+            await self.async_sync()
+        except MySutroError as e:
+            _LOGGER.warning("History sync failed, will retry on next reading: %s", e)
+
+    async def async_sync(self) -> int:
+        """Fetches and imports every reading after the high-water mark.
+
+        Returns:
+            int: number of new readings imported
+        """
+        async with self._lock:
+            now = dt_util.utcnow()
+            oldest_available = now - timedelta(days=HISTORY_RETENTION)
+            start = self.high_water_mark
+            if start is None or start < oldest_available:
+                if start is not None:
+                    _LOGGER.warning(
+                        "Readings between %s and %s are no longer available from the Sutro API",
+                        start,
+                        oldest_available,
+                    )
+                start = oldest_available
+            imported = 0
+            # Re-read the whole hour holding the high-water mark so its bucket is complete.
+            # Windows are walked oldest first, the mark only ever moves over a fetched range.
+            window_start = _hour_start(start)
+            while window_start < now:
+                window_end = min(now, window_start + timedelta(days=HISTORY_SYNC_WINDOW))
+                readings, complete_from = await self._async_fetch_window(window_start, window_end)
+                if self.reading_store is not None:
+                    await self.reading_store.async_add_readings(readings, complete_from, window_end)
+                if complete_from > window_start:
+                    _LOGGER.warning(
+                        "History sync stopped at %s, the next sync continues from there", window_start
+                    )
+                    break
+                imported += await self._async_import_window(readings)
+                window_start = window_end
+            if imported > 1:
+                _LOGGER.info("Filled a gap of %d readings from the Sutro history", imported)
+            return imported
+
+    async def _async_import_window(self, readings: list[HistoricalReading]) -> int:
+        """Imports a completely fetched window and saves the high-water mark after it.
+
+        Returns:
+            int: number of readings newer than the previous mark
+        """
+        new_readings = [
+            reading for reading in readings
+            if self.high_water_mark is None
+            or reading.reading_time > self.high_water_mark
+        ]
+        if not new_readings:
+            return 0
+        self._async_import_statistics(readings)
+        self.high_water_mark = max(reading.reading_time for reading in new_readings)
+        await self._store.async_save({"high_water_mark": self.high_water_mark.isoformat()})
+        return len(new_readings)
+
+    async def _async_fetch_window(self, start: datetime, end: datetime) -> tuple[list[HistoricalReading], datetime]:
+        """Pages through historicalReadings from end back to start.
+
+        Returns:
+            the readings, and the time from which they are complete, start
+            unless the page limit was hit
+        """
+        complete_from = start
+        readings: list[HistoricalReading] = []
+        for _ in range(HISTORY_MAX_PAGES):
+            page = await self.gateway.async_get_historical_readings(
+                self.pool_id,
+                _format_time(start), _format_time(end), HISTORY_PAGE_SIZE
+            )
+            page = [reading for reading in page if reading.reading_time is not None]
+            readings.extend(page)
+            if len(page) < HISTORY_PAGE_SIZE:
+                break
+            oldest = min(reading.reading_time for reading in page)
+            if oldest <= start:
+                break
+            end = oldest - timedelta(seconds=1)
+        else:
+            _LOGGER.warning("History sync stopped after %d pages", HISTORY_MAX_PAGES)
+            complete_from = end + timedelta(seconds=1)
+        return readings, complete_from
+
+    @callback
+    def _async_import_statistics(self, readings: list[HistoricalReading]) -> None:
+        """Imports hourly mean/min/max of each chemistry value."""
+        buckets: dict[datetime, list[HistoricalReading]] = {}
+        for reading in readings:
+            buckets.setdefault(_hour_start(dt_util.as_utc(reading.reading_time)), []).append(reading)
+
+        for key, prop in PROP_MAP.items():
+            statistics: list[StatisticData] = []
+            for start, bucket in sorted(buckets.items()):
+                values = [reading.get(key) for reading in bucket if reading.get(key) is not None]
+                if not values:
+                    continue
+                statistics.append(
+                    StatisticData(
+                        start=start,
+                        mean=sum(values) / len(values),
+                        min=min(values),
+                        max=max(values),
+                    )
+                )
+            if not statistics:
+                continue
+            metadata = StatisticMetaData(
+                mean_type=StatisticMeanType.ARITHMETIC,
+                has_sum=False,
+                name=f"{self.entry.title} {key}",
+                source=DOMAIN,
+                statistic_id=self.statistic_id(key),
+                # pH has no unit and ppm is not converted, neither needs a unit converter
+                unit_class=None,
+                unit_of_measurement=prop['unit'],
+            )
+            async_add_external_statistics(self.hass, metadata, statistics)
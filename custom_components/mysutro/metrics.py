@@ -0,0 +1,192 @@
+"""Request metrics and phase timings recorded by the gateway."""
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterator
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+import time
+from typing import Any
+
+from .const import SLOW_SECTION_THRESHOLD, SLOW_WARNING_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """Latency histogram, sizes, status codes and outcomes of API requests"""
+    def __init__(self) -> None:
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.throttle_wait = 0.0
+        self.status_codes: Counter[int] = Counter()
+        self.operations: Counter[str] = Counter()
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = 0.0
+        self.last_latency: float | None = None
+        self.response_bytes = 0
+        self.last_response_bytes: int | None = None
+        self.last_success: datetime | None = None
+        self.last_failure: datetime | None = None
+        self.last_error: str | None = None
+
+    def record_response(self, operation: str, status: int, latency: float, size: int) -> None:
+        """Records one HTTP round trip."""
+        self.requests += 1
+        self.operations[operation] += 1
+        self.status_codes[status] += 1
+        self.last_latency = latency
+        self.latency_total += latency
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_counts[index] += 1
+                break
+        else:
+            self.latency_counts[-1] += 1
+        self.last_response_bytes = size
+        self.response_bytes += size
+
+    def record_success(self) -> None:
+        """Records a request that returned usable data."""
+        self.last_success = datetime.now(timezone.utc)
+
+    def record_failure(self, error: Exception | str) -> None:
+        """Records a request that failed after any retries."""
+        self.failures += 1
+        self.last_failure = datetime.now(timezone.utc)
+        self.last_error = str(error)
+
+    def record_retry(self) -> None:
+        """Records a request sent again after a failure."""
+        self.retries += 1
+
+    def record_rejected(self) -> None:
+        """Records a request held back by the open circuit."""
+        self.rejected += 1
+
+    def record_throttle(self, waited: float) -> None:
+        """Records the time a request waited for the rate budget."""
+        if waited:
+            self.throttled += 1
+            self.throttle_wait += waited
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Estimates a latency percentile as the upper bound of its bucket."""
+        total = sum(self.latency_counts)
+        if not total:
+            return None
+        threshold = total * percentile / 100
+        seen = 0
+        for index, count in enumerate(self.latency_counts):
+            seen += count
+            if seen >= threshold:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float("inf")
+        return None
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Mean latency of all recorded requests, in seconds."""
+        total = sum(self.latency_counts)
+        return self.latency_total / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the metrics in a JSON-serializable form."""
+        histogram = {
+            f"le_{bound}": count
+            for bound, count in zip(LATENCY_BUCKETS, self.latency_counts)
+        }
+        histogram["le_inf"] = self.latency_counts[-1]
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "throttle_wait": round(self.throttle_wait, 3),
+            "status_codes": dict(self.status_codes),
+            "operations": dict(self.operations),
+            "latency_histogram": histogram,
+            "latency_mean": self.mean_latency,
+            "latency_p95": self.latency_percentile(95),
+            "last_latency": self.last_latency,
+            "response_bytes": self.response_bytes,
+            "last_response_bytes": self.last_response_bytes,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "last_failure": self.last_failure.isoformat() if self.last_failure else None,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass(slots=True)
+class PhaseTiming:
+    """Durations of one phase"""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float | None = None
+    slow: int = 0
+    warned_at: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3) if self.last is not None else None,
+            "slow": self.slow,
+        }
+
+
+class PhaseTimings:
+    """Durations of the fetch, parse, decode and listener phases
+
+    A span that runs on the event loop without awaiting blocks it. Such spans
+    warn when they take longer than the threshold, at most once per
+    SLOW_WARNING_INTERVAL and phase. Spans that await only measure.
+    """
+    def __init__(self, threshold: float = SLOW_SECTION_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._phases: dict[str, PhaseTiming] = {}
+
+    @contextlib.contextmanager
+    def span(self, phase: str, blocking: bool = True) -> Iterator[None]:
+        """Times the body of a with statement as a phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started, blocking)
+
+    def record(self, phase: str, duration: float, blocking: bool = True) -> None:
+        timing = self._phases.get(phase)
+        if timing is None:
+            timing = self._phases[phase] = PhaseTiming()
+        timing.count += 1
+        timing.total += duration
+        timing.last = duration
+        timing.max = max(timing.max, duration)
+        if not blocking or duration <= self.threshold:
+            return
+        timing.slow += 1
+        now = time.monotonic()
+        if timing.warned_at is None or now - timing.warned_at >= SLOW_WARNING_INTERVAL:
+            timing.warned_at = now
+            _LOGGER.warning(
+                "mySutro %s held the event loop for %.0f ms (%d slow so far), "
+                "the mysutro.profile service shows where the time goes",
+                phase,
+                duration * 1000,
+                timing.slow,
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the timings of every phase seen so far."""
+        return {phase: timing.as_dict() for phase, timing in self._phases.items()}
@@ -0,0 +1,317 @@
+"""Typed snapshot of a pool, decoded once per fetch."""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any
+
+from .query import TIER_FIELDS
+
+# API field name -> PoolSnapshot attribute
+FIELD_ATTRIBUTES = {
+    "ph": "ph",
+    "chlorine": "chlorine",
+    "bromine": "bromine",
+    "alkalinity": "alkalinity",
+    "minAlkalinity": "min_alkalinity",
+    "maxAlkalinity": "max_alkalinity",
+    "readingTime": "reading_time",
+    "invalidatingTrends": "invalidating_trends",
+    "batteryLevel": "battery_level",
+    "temperature": "temperature",
+    "cartridgeCharges": "cartridge_charges",
+    "online": "online",
+    "lidOpen": "lid_open",
+    "lastMessage": "last_message",
+    "health": "health",
+    "latestRecommendations": "recommendations",
+    "conflictWarning": "conflict_warning",
+    "currentlyEligibleForShipment": "cartridge_eligible",
+    "wentUnderThresholdAt": "cartridge_under_threshold_at",
+    "subscriptionState": "subscription_state",
+    "poolProfile": "pool_profile",
+    "manualReadingsInProgress": "manual_readings",
+}
+
+# PoolProfile API field -> attribute
+PROFILE_ATTRIBUTES = {
+    "id": "id",
+    "sanitizerName": "sanitizer_name",
+    "phTarget": "ph_target",
+    "phOkayLow": "ph_okay_low",
+    "phOkayHigh": "ph_okay_high",
+    "chlorineTarget": "chlorine_target",
+    "chlorineOkayLow": "chlorine_okay_low",
+    "chlorineOkayHigh": "chlorine_okay_high",
+    "alkalinityTarget": "alkalinity_target",
+    "alkalinityOkayLow": "alkalinity_okay_low",
+    "alkalinityOkayHigh": "alkalinity_okay_high",
+}
+
+
+def _float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def _int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+def _bool(value: Any) -> bool | None:
+    return None if value is None else bool(value)
+
+
+def _datetime(value: Any) -> datetime | None:
+    if value is None or isinstance(value, datetime):
+        return value
+    # The API sends ISO-8601 with a Z suffix, which fromisoformat accepts
+    return datetime.fromisoformat(value)
+
+
+def _tuple(value: Any) -> tuple[str, ...]:
+    return tuple(value or ())
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    """A treatment SutroAI advises for one chemistry value"""
+    id: str
+    type: str | None = None
+    decision: str | None = None
+    treatment: str | None = None
+    explanation: str | None = None
+    expired_at: datetime | None = None
+    completed_at: datetime | None = None
+    chemical_id: str | None = None
+    chemical_name: str | None = None
+    chemical_upc: str | None = None
+
+    @property
+    def current(self) -> bool:
+        """True until the recommendation expires or is completed."""
+        return self.expired_at is None and self.completed_at is None
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> Recommendation:
+        """Decodes a Recommendation selection."""
+        chemical = raw.get("chemical") or {}
+        return cls(
+            id=str(raw.get("id")),
+            type=raw.get("type"),
+            decision=raw.get("decision"),
+            treatment=raw.get("treatment"),
+            explanation=raw.get("explanation"),
+            expired_at=_datetime(raw.get("expiredAt")),
+            completed_at=_datetime(raw.get("completedAt")),
+            chemical_id=chemical.get("id"),
+            chemical_name=chemical.get("name"),
+            chemical_upc=chemical.get("upc"),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the recommendation shaped like the API selection."""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "decision": self.decision,
+            "treatment": self.treatment,
+            "explanation": self.explanation,
+            "expiredAt": _isoformat(self.expired_at),
+            "completedAt": _isoformat(self.completed_at),
+            "chemical": {"id": self.chemical_id, "name": self.chemical_name, "upc": self.chemical_upc},
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class PoolProfile:
+    """Targets and ok ranges SutroAI assesses readings against"""
+    id: str | None = None
+    sanitizer_name: str | None = None
+    ph_target: float | None = None
+    ph_okay_low: float | None = None
+    ph_okay_high: float | None = None
+    chlorine_target: float | None = None
+    chlorine_okay_low: float | None = None
+    chlorine_okay_high: float | None = None
+    alkalinity_target: float | None = None
+    alkalinity_okay_low: float | None = None
+    alkalinity_okay_high: float | None = None
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> PoolProfile:
+        """Decodes a PoolProfile selection."""
+        values = {attribute: raw.get(key) for key, attribute in PROFILE_ATTRIBUTES.items()}
+        for attribute, value in values.items():
+            if attribute not in ("id", "sanitizer_name"):
+                values[attribute] = _float(value)
+        return cls(**values)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the profile shaped like the API selection."""
+        return {key: getattr(self, attribute) for key, attribute in PROFILE_ATTRIBUTES.items()}
+
+    def target_range(self, key: str) -> dict[str, float | None]:
+        """Returns target and ok range of a chemistry value, e.g. ph."""
+        return {
+            "target": getattr(self, f"{key}_target", None),
+            "okay_low": getattr(self, f"{key}_okay_low", None),
+            "okay_high": getattr(self, f"{key}_okay_high", None),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ManualReading:
+    """A reading requested from the device in the last day"""
+    id: str
+    status: str | None = None
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> ManualReading:
+        """Decodes a ManualReading selection."""
+        return cls(id=str(raw.get("id")), status=raw.get("status"))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the manual reading shaped like the API selection."""
+        return {"id": self.id, "status": self.status}
+
+
+def _manual_readings(value: Any) -> tuple[ManualReading, ...]:
+    return tuple(ManualReading.from_dict(raw) for raw in value or () if raw)
+
+
+def _recommendations(value: Any) -> tuple[Recommendation, ...]:
+    return tuple(Recommendation.from_dict(raw) for raw in value or () if raw)
+
+
+def _profile(value: Any) -> PoolProfile | None:
+    return PoolProfile.from_dict(value) if value else None
+
+
+def _plain(value: Any) -> Any:
+    """Converts a snapshot value to JSON-serializable form."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Recommendation, PoolProfile, ManualReading)):
+        return value.as_dict()
+    if isinstance(value, tuple):
+        return [_plain(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class PoolSnapshot:
+    """Latest reading, device telemetry and slow tiers of one pool
+
+    Fields that were not selected by the query are None. Tiers not fetched by
+    a poll are carried over from the previous snapshot.
+    """
+    pool_id: str
+    ph: float | None = None
+    chlorine: float | None = None
+    bromine: float | None = None
+    alkalinity: float | None = None
+    min_alkalinity: float | None = None
+    max_alkalinity: float | None = None
+    reading_time: datetime | None = None
+    invalidating_trends: tuple[str, ...] = ()
+    battery_level: int | None = None
+    temperature: float | None = None
+    cartridge_charges: int | None = None
+    online: bool | None = None
+    lid_open: bool | None = None
+    last_message: datetime | None = None
+    health: str | None = None
+    recommendations: tuple[Recommendation, ...] = ()
+    conflict_warning: str | None = None
+    cartridge_eligible: bool | None = None
+    cartridge_under_threshold_at: datetime | None = None
+    subscription_state: str | None = None
+    pool_profile: PoolProfile | None = None
+    manual_readings: tuple[ManualReading, ...] = ()
+
+    @classmethod
+    def from_dict(cls, pool_id: str, raw: dict[str, Any]) -> PoolSnapshot:
+        """Decodes a flat dict keyed by API field names."""
+        return cls(
+            pool_id=pool_id,
+            ph=_float(raw.get("ph")),
+            chlorine=_float(raw.get("chlorine")),
+            bromine=_float(raw.get("bromine")),
+            alkalinity=_float(raw.get("alkalinity")),
+            min_alkalinity=_float(raw.get("minAlkalinity")),
+            max_alkalinity=_float(raw.get("maxAlkalinity")),
+            reading_time=_datetime(raw.get("readingTime")),
+            invalidating_trends=_tuple(raw.get("invalidatingTrends")),
+            battery_level=_int(raw.get("batteryLevel")),
+            temperature=_float(raw.get("temperature")),
+            cartridge_charges=_int(raw.get("cartridgeCharges")),
+            online=_bool(raw.get("online")),
+            lid_open=_bool(raw.get("lidOpen")),
+            last_message=_datetime(raw.get("lastMessage")),
+            health=raw.get("health"),
+            recommendations=_recommendations(raw.get("latestRecommendations")),
+            conflict_warning=raw.get("conflictWarning"),
+            cartridge_eligible=_bool(raw.get("currentlyEligibleForShipment")),
+            cartridge_under_threshold_at=_datetime(raw.get("wentUnderThresholdAt")),
+            subscription_state=raw.get("subscriptionState"),
+            pool_profile=_profile(raw.get("poolProfile")),
+            manual_readings=_manual_readings(raw.get("manualReadingsInProgress")),
+        )
+
+    @classmethod
+    def from_pool(
+        cls,
+        pool_id: str,
+        pool: dict[str, Any],
+        tiers: frozenset[str] = frozenset(),
+        previous: PoolSnapshot | None = None,
+    ) -> PoolSnapshot:
+        """Decodes a getPool selection, merging the tiers it did not fetch from previous."""
+        device = pool.get("device") or {}
+        raw = {**(pool.get("latestReading") or {}), **device}
+        if "recommendations" in tiers:
+            latest = pool.get("latestRecommendations") or {}
+            raw["latestRecommendations"] = latest.get("recommendations")
+            raw["conflictWarning"] = latest.get("conflictWarning")
+        if "cartridge" in tiers:
+            shipment = device.get("cartridgeShipmentData") or {}
+            raw["currentlyEligibleForShipment"] = shipment.get("currentlyEligibleForShipment")
+            raw["wentUnderThresholdAt"] = shipment.get("wentUnderThresholdAt")
+            raw["subscriptionState"] = (device.get("subscription") or {}).get("state")
+        if "profile" in tiers:
+            raw["poolProfile"] = pool.get("poolProfile")
+        snapshot = cls.from_dict(pool_id, raw)
+        if previous is None:
+            return snapshot
+        carried = {
+            FIELD_ATTRIBUTES[key]: getattr(previous, FIELD_ATTRIBUTES[key])
+            for tier, keys in TIER_FIELDS.items()
+            if tier not in tiers
+            for key in keys
+        }
+        return replace(snapshot, **carried) if carried else snapshot
+
+    def get(self, key: str) -> Any:
+        """Returns a value by its API field name."""
+        return getattr(self, FIELD_ATTRIBUTES[key])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns a JSON-serializable dict keyed by API field names."""
+        raw: dict[str, Any] = {}
+        for key, attribute in FIELD_ATTRIBUTES.items():
+            value = getattr(self, attribute)
+            raw[key] = _plain(value)
+        return raw
+
+    def changed_fields(self, other: PoolSnapshot | None) -> set[str]:
+        """Returns the API field names whose value differs from another snapshot."""
+        if other is None:
+            return set(FIELD_ATTRIBUTES)
+        return {
+            key for key, attribute in FIELD_ATTRIBUTES.items()
+            if getattr(self, attribute) != getattr(other, attribute)
+        }
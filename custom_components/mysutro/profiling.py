@@ -0,0 +1,111 @@
+"""On-demand profiling of the integration's code on the event loop."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import cProfile
+import logging
+import os
+import pstats
+import tracemalloc
+from typing import Any
+
+from .const import PROFILE_TOP
+from .gateway import MySutroError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reports only list code of this package
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_CAPTURE_LOCK = asyncio.Lock()
+
+
+class MySutroProfileError(MySutroError):
+    """Error to indicate a profile could not be captured."""
+
+
+async def _run_inline(func: Callable[..., Any], *args: Any) -> Any:
+    return func(*args)
+
+
+def _in_package(filename: str) -> bool:
+    return filename.startswith(PACKAGE_DIR + os.sep)
+
+
+def _location(filename: str, line: int) -> str:
+    return f"{os.path.relpath(filename, PACKAGE_DIR)}:{line}"
+
+
+def _report(
+    profile: cProfile.Profile,
+    before: tracemalloc.Snapshot,
+    after: tracemalloc.Snapshot,
+    top: int,
+) -> dict[str, Any]:
+    """Summarizes this package's functions and allocations of a capture."""
+    functions = [
+        {
+            "function": f"{_location(filename, line)}({name})",
+            "calls": calls,
+            "total_time": round(total_time, 6),
+            "cumulative_time": round(cumulative_time, 6),
+        }
+        for (filename, line, name), (_, calls, total_time, cumulative_time, _) in pstats.Stats(profile).stats.items()
+        if _in_package(filename)
+    ]
+    functions.sort(key=lambda item: item["cumulative_time"], reverse=True)
+    package = [tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*"))]
+    allocations = [
+        {
+            "line": _location(diff.traceback[0].filename, diff.traceback[0].lineno),
+            "size_diff": diff.size_diff,
+            "count_diff": diff.count_diff,
+            "size": diff.size,
+        }
+        for diff in after.filter_traces(package).compare_to(before.filter_traces(package), "lineno")
+        if diff.size_diff
+    ]
+    return {"functions": functions[:top], "allocations": allocations[:top]}
+
+
+async def async_capture_profile(
+    duration: float,
+    run_blocking: Callable[..., Awaitable[Any]] = _run_inline,
+    top: int = PROFILE_TOP,
+) -> dict[str, Any]:
+    """Profiles the event loop thread for a while and reports this package's share.
+
+    cProfile follows the calling thread only, which is the event loop, where
+    slow code hurts. Allocations are traced for the same time.
+
+    Args:
+        duration: seconds to capture
+        run_blocking: runs snapshots and the report off the event loop, e.g. hass.async_add_executor_job
+
+    Raises:
+        MySutroProfileError: a capture is running or another profiler is active
+    """
+    if _CAPTURE_LOCK.locked():
+        raise MySutroProfileError("A profile is already being captured")
+    async with _CAPTURE_LOCK:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        try:
+            before = await run_blocking(tracemalloc.take_snapshot)
+            try:
+                profile.enable()
+            except ValueError as ex:
+                raise MySutroProfileError(f"Another profiler is active: {ex}") from ex
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                profile.disable()
+            after = await run_blocking(tracemalloc.take_snapshot)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        _LOGGER.info("Captured a %.0f s profile", duration)
+        return {"duration": duration, **await run_blocking(_report, profile, before, after, top)}
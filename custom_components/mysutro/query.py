@@ -0,0 +1,132 @@
+"""Compiles the field-minimal GraphQL documents sent on every poll."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+from typing import Iterable
+
+# PoolReading fields an entity can ask for, by entity data key
+READING_FIELDS = (
+    "alkalinity",
+    "bromine",
+    "chlorine",
+    "ph",
+    "minAlkalinity",
+    "maxAlkalinity",
+    "readingTime",
+    "invalidatingTrends",
+)
+
+# Device fields an entity can ask for, by entity data key
+DEVICE_FIELDS = (
+    "batteryLevel",
+    "temperature",
+    "cartridgeCharges",
+    "online",
+    "lidOpen",
+    "lastMessage",
+    "health",
+)
+
+# Selected whatever is enabled, the coordinator and history sync key off them
+ALWAYS_SELECTED = frozenset({"readingTime"})
+
+# Slow-changing data, fetched on its own cadence: tier -> (pool selection, device selection)
+TIERS = {
+    "recommendations": (
+        "latestRecommendations { conflictWarning recommendations { id type decision "
+        "treatment explanation expiredAt completedAt chemical { id name upc } } }",
+        "",
+    ),
+    "cartridge": (
+        "",
+        "cartridgeShipmentData { currentlyEligibleForShipment wentUnderThresholdAt updatedAt } "
+        "subscription { state }",
+    ),
+    "profile": (
+        "poolProfile { id sanitizerName phTarget phOkayLow phOkayHigh chlorineTarget "
+        "chlorineOkayLow chlorineOkayHigh alkalinityTarget alkalinityOkayLow alkalinityOkayHigh }",
+        "",
+    ),
+    "manual": ("", "manualReadingsInProgress { id status }"),
+}
+
+# Entity data keys served by each tier
+TIER_FIELDS = {
+    "recommendations": ("latestRecommendations", "conflictWarning"),
+    "cartridge": ("currentlyEligibleForShipment", "wentUnderThresholdAt", "subscriptionState"),
+    "profile": ("poolProfile",),
+    "manual": ("manualReadingsInProgress",),
+}
+
+ALL_FIELDS = frozenset(READING_FIELDS + DEVICE_FIELDS) | frozenset(
+    field for fields in TIER_FIELDS.values() for field in fields
+)
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """A query document and the hash it can be persisted under"""
+    document: str
+    sha256: str
+    operation_name: str
+
+    @property
+    def extensions(self) -> dict:
+        """Persisted-query extension sent alongside the document."""
+        return {"persistedQuery": {"version": 1, "sha256Hash": self.sha256}}
+
+
+def pool_alias(pool_id: str) -> str:
+    """Returns the alias a pool is selected under in a batched query."""
+    return f"p{pool_id}"
+
+
+def wanted_tiers(fields: frozenset[str]) -> frozenset[str]:
+    """Returns the tiers serving at least one of the requested fields."""
+    return frozenset(tier for tier, tier_fields in TIER_FIELDS.items() if not fields.isdisjoint(tier_fields))
+
+
+def pool_selection(fields: frozenset[str], tiers: frozenset[str] = frozenset()) -> str:
+    """Returns the selection set for one pool covering the requested fields and tiers."""
+    reading = sorted((fields & frozenset(READING_FIELDS)) | ALWAYS_SELECTED)
+    selection = "id latestReading { " + " ".join(reading) + " }"
+    device = sorted(fields & frozenset(DEVICE_FIELDS))
+    for tier in sorted(tiers):
+        pool_part, device_part = TIERS[tier]
+        if pool_part:
+            selection += " " + pool_part
+        if device_part:
+            device.append(device_part)
+    if device:
+        selection += " device { " + " ".join(device) + " }"
+    return selection
+
+
+@lru_cache(maxsize=32)
+def compile_pools_query(
+    pool_ids: tuple[str, ...], fields: frozenset[str], tiers: frozenset[str] = frozenset()
+) -> CompiledQuery:
+    """Builds one aliased query selecting every pool of an account.
+
+    Results are cached, so a document is only rebuilt when the pools, the
+    set of enabled entities or the tiers due change.
+    """
+    selection = pool_selection(fields, tiers)
+    aliases = " ".join(
+        f"{pool_alias(pool_id)}: getPool(poolId: {int(pool_id)}) {{ {selection} }}"
+        for pool_id in sorted(pool_ids)
+    )
+    operation_name = "MySutroPools"
+    document = f"query {operation_name} {{ {aliases} }}"
+    return CompiledQuery(
+        document=document,
+        sha256=hashlib.sha256(document.encode()).hexdigest(),
+        operation_name=operation_name,
+    )
+
+
+def required_fields(contexts: Iterable[object]) -> frozenset[str]:
+    """Maps the contexts of listening entities to the fields they read."""
+    return frozenset(context for context in contexts if isinstance(context, str))
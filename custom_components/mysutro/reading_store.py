@@ -0,0 +1,347 @@
+"""Local SQLite store of readings, queried instead of the Sutro API."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any
+
+from .const import HISTORY_RETENTION, READING_CACHE_SIZE
+from .gateway import MySutroError, MySutroGateway
+from .generated import HISTORICAL_READING_ATTRIBUTES, HistoricalReading
+from .models import PoolSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Chemistry columns of the readings table, named like the reading attributes
+VALUE_COLUMNS = tuple(
+    attribute for attribute in HISTORICAL_READING_ATTRIBUTES.values()
+    if attribute not in ("reading_time", "invalidating_trends")
+)
+
+# API fields a poll must have selected for its snapshot to be a complete reading
+READING_API_FIELDS = frozenset(
+    field for field, attribute in HISTORICAL_READING_ATTRIBUTES.items() if attribute != "reading_time"
+)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS readings (pool_id TEXT NOT NULL, reading_time REAL NOT NULL, "
+    + "".join(f"{column} REAL, " for column in VALUE_COLUMNS)
+    + "invalidating_trends TEXT, PRIMARY KEY (pool_id, reading_time)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS covered (pool_id TEXT NOT NULL, start_time REAL NOT NULL, "
+    "end_time REAL NOT NULL)",
+)
+
+# Rewriting an unchanged reading is not counted as a change
+UPSERT = (
+    f"INSERT INTO readings (pool_id, reading_time, {', '.join(VALUE_COLUMNS)}, invalidating_trends) "
+    f"VALUES ({', '.join('?' * (len(VALUE_COLUMNS) + 3))}) "
+    "ON CONFLICT (pool_id, reading_time) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in (*VALUE_COLUMNS, "invalidating_trends"))
+    + " WHERE "
+    + " OR ".join(f"{column} IS NOT excluded.{column}" for column in (*VALUE_COLUMNS, "invalidating_trends"))
+)
+
+Range = tuple[float, float]
+
+
+class MySutroStoreError(MySutroError):
+    """Error to indicate the local reading store failed."""
+
+
+def merge_range(ranges: list[Range], start: float, end: float) -> list[Range]:
+    """Returns sorted, disjoint ranges with start..end added."""
+    merged = []
+    for range_start, range_end in sorted([*ranges, (start, end)]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def missing_ranges(ranges: list[Range], start: float, end: float) -> list[Range]:
+    """Returns the parts of start..end not in the sorted, disjoint ranges."""
+    missing = []
+    cursor = start
+    for range_start, range_end in ranges:
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            missing.append((cursor, range_start))
+        cursor = range_end
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def _row(pool_id: str, reading: HistoricalReading | PoolSnapshot) -> tuple:
+    return (
+        pool_id,
+        reading.reading_time.timestamp(),
+        *(getattr(reading, column) for column in VALUE_COLUMNS),
+        ";".join(reading.invalidating_trends) or None,
+    )
+
+
+def _reading(row: tuple) -> HistoricalReading:
+    reading_time, *values, invalidating_trends = row
+    return HistoricalReading(
+        reading_time=datetime.fromtimestamp(reading_time, timezone.utc),
+        invalidating_trends=tuple(invalidating_trends.split(";")) if invalidating_trends else (),
+        **dict(zip(VALUE_COLUMNS, values)),
+    )
+
+
+class ReadingDatabase:
+    """Blocking SQLite access, run every method in an executor thread
+
+    Readings are keyed by pool and reading time. The covered table holds, per
+    pool, the time ranges whose readings are all stored.
+    """
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        # The connection is shared by executor threads, one statement at a time
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        self._connection = connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def load(self, pool_id: str) -> tuple[list[Range], float | None]:
+        """Returns the covered ranges and the newest reading time of a pool."""
+        with self._lock:
+            ranges = self._connection.execute(
+                "SELECT start_time, end_time FROM covered WHERE pool_id = ? ORDER BY start_time",
+                (pool_id,),
+            ).fetchall()
+            (newest,) = self._connection.execute(
+                "SELECT MAX(reading_time) FROM readings WHERE pool_id = ?", (pool_id,)
+            ).fetchone()
+        return [tuple(item) for item in ranges], newest
+
+    def add(self, pool_id: str, readings: Iterable[HistoricalReading | PoolSnapshot], covered: list[Range] | None) -> int:
+        """Stores readings and replaces the covered ranges of a pool.
+
+        Returns:
+            int: number of readings added or changed
+        """
+        rows = [_row(pool_id, reading) for reading in readings if reading.reading_time]
+        with self._lock, self._connection as connection:
+            before = connection.total_changes
+            connection.executemany(UPSERT, rows)
+            changed = connection.total_changes - before
+            if covered is not None:
+                connection.execute("DELETE FROM covered WHERE pool_id = ?", (pool_id,))
+                connection.executemany(
+                    "INSERT INTO covered VALUES (?, ?, ?)",
+                    [(pool_id, start, end) for start, end in covered],
+                )
+        return changed
+
+    def remove(self, pool_id: str) -> None:
+        """Deletes a pool's readings and covered ranges."""
+        with self._lock, self._connection as connection:
+            connection.execute("DELETE FROM readings WHERE pool_id = ?", (pool_id,))
+            connection.execute("DELETE FROM covered WHERE pool_id = ?", (pool_id,))
+
+    def query(self, pool_id: str, start: float, end: float) -> list[HistoricalReading]:
+        """Returns a pool's readings from start to end, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT reading_time, {', '.join(VALUE_COLUMNS)}, invalidating_trends FROM readings "
+                "WHERE pool_id = ? AND reading_time BETWEEN ? AND ? ORDER BY reading_time",
+                (pool_id, start, end),
+            ).fetchall()
+        return [_reading(row) for row in rows]
+
+
+def remove_pool_readings(path: str | os.PathLike, pool_id: str) -> None:
+    """Deletes every reading and covered range of a pool, blocking."""
+    if not os.path.exists(path):
+        return
+    database = ReadingDatabase(path)
+    database.open()
+    try:
+        database.remove(pool_id)
+    finally:
+        database.close()
+
+
+async def _run_inline(func: Callable[..., Any], *args: Any) -> Any:
+    return func(*args)
+
+
+class MySutroReadingStore:
+    """A pool's readings served from the local database
+
+    The API is only asked for ranges the database has never covered, the
+    history sync and every poll keep the coverage up to date. Query results
+    sit in an LRU cache that is dropped whenever stored readings change.
+
+    Args:
+        path: the SQLite file, shared by the stores of every pool
+        gateway (MySutroGateway): gateway used to fill missing ranges
+        pool_id (str): the pool whose readings are stored
+        run_blocking: runs database calls off the event loop, e.g. hass.async_add_executor_job
+    """
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        gateway: MySutroGateway,
+        pool_id: str,
+        run_blocking: Callable[..., Awaitable[Any]] = _run_inline,
+    ) -> None:
+        self.database = ReadingDatabase(path)
+        self.gateway = gateway
+        self.pool_id = pool_id
+        self._run_blocking = run_blocking
+        self._covered: list[Range] = []
+        self._newest: float | None = None
+        self._cache: OrderedDict[Range, tuple[HistoricalReading, ...]] = OrderedDict()
+        self._fill_lock = asyncio.Lock()
+        # Coverage is merged in memory, concurrent writers must not lose a range
+        self._write_lock = asyncio.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fetched_ranges = 0
+
+    async def async_open(self) -> None:
+        """Opens the database and loads the pool's coverage.
+
+        Raises:
+            MySutroStoreError: the database could not be opened
+        """
+        await self._async_run(self.database.open)
+        self._covered, self._newest = await self._async_run(self.database.load, self.pool_id)
+
+    async def async_close(self) -> None:
+        await self._run_blocking(self.database.close)
+
+    async def _async_run(self, func: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return await self._run_blocking(func, *args)
+        except (sqlite3.Error, OSError) as ex:
+            raise MySutroStoreError(f"Reading store failed: {ex}") from ex
+
+    @property
+    def synced_until(self) -> float | None:
+        """Timestamp up to which every reading is stored."""
+        return self._covered[-1][1] if self._covered else None
+
+    @property
+    def newest_reading_time(self) -> datetime | None:
+        """Time of the newest stored reading."""
+        return datetime.fromtimestamp(self._newest, timezone.utc) if self._newest is not None else None
+
+    async def async_add_readings(
+        self,
+        readings: list[HistoricalReading] | list[PoolSnapshot],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> None:
+        """Stores readings, start and end mark a range known to be complete.
+
+        Raises:
+            MySutroStoreError: the database could not be written
+        """
+        async with self._write_lock:
+            covered = None
+            if start is not None and end is not None and start < end:
+                covered = merge_range(self._covered, start.timestamp(), end.timestamp())
+            changed = await self._async_run(self.database.add, self.pool_id, readings, covered)
+            if covered is not None:
+                self._covered = covered
+        if changed:
+            newest = max(reading.reading_time.timestamp() for reading in readings if reading.reading_time)
+            self._newest = max(self._newest or newest, newest)
+            self._cache.clear()
+
+    async def async_add_latest(
+        self, snapshot: PoolSnapshot, fetched_at: datetime, fields: frozenset[str] | None = None
+    ) -> None:
+        """Stores a poll's latest reading, no newer one existed when it was fetched.
+
+        The coordinator adds READING_API_FIELDS to every poll. A snapshot
+        missing some of them is not stored, its reading time stays uncovered
+        so the reading is fetched in full when it is asked for.
+        """
+        if snapshot.reading_time is None:
+            return
+        if fields is not None and not READING_API_FIELDS <= fields:
+            await self.async_add_readings([], snapshot.reading_time + timedelta(milliseconds=1), fetched_at)
+            return
+        await self.async_add_readings([snapshot], snapshot.reading_time, fetched_at)
+
+    async def async_get_readings(self, start: datetime, end: datetime | None = None) -> tuple[HistoricalReading, ...]:
+        """Returns the pool's readings from start to end, oldest first.
+
+        Raises:
+            MySutroError: a range missing locally could not be fetched, or the
+                store could not be read
+        """
+        now = datetime.now(timezone.utc)
+        end = min(end or now, now)
+        async with self._fill_lock:
+            await self._async_fill(start, end, now)
+        # Nothing is stored after the newest reading, ranges ending later share an entry
+        key = (start.timestamp(), min(end.timestamp(), self._newest or end.timestamp()))
+        readings = self._cache.get(key)
+        if readings is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return readings
+        self.cache_misses += 1
+        readings = tuple(await self._async_run(self.database.query, self.pool_id, *key))
+        self._cache[key] = readings
+        if len(self._cache) > READING_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return readings
+
+    async def _async_fill(self, start: datetime, end: datetime, now: datetime) -> None:
+        """Fetches the parts of start..end never covered that the API still keeps."""
+        oldest = (now - timedelta(days=HISTORY_RETENTION)).timestamp()
+        # Readings after the last poll are not known yet, the next poll brings them
+        newest = min(end.timestamp(), self.synced_until or end.timestamp())
+        for gap_start, gap_end in missing_ranges(self._covered, max(start.timestamp(), oldest), newest):
+            gap = (datetime.fromtimestamp(gap_start, timezone.utc), datetime.fromtimestamp(gap_end, timezone.utc))
+            _LOGGER.debug("Fetching readings of pool %s from %s to %s", self.pool_id, *gap)
+            # The export module holds the paging loop, only a gap needs it
+            from .export import async_iter_readings  # pylint: disable=import-outside-toplevel
+
+            readings: list[HistoricalReading] = []
+            async for page in async_iter_readings(self.gateway, self.pool_id, *gap):
+                readings.extend(page)
+            await self.async_add_readings(readings, *gap)
+            self.fetched_ranges += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Coverage and cache counters, for diagnostics."""
+        return {
+            "covered": [
+                [datetime.fromtimestamp(start, timezone.utc).isoformat(), datetime.fromtimestamp(end, timezone.utc).isoformat()]
+                for start, end in self._covered
+            ],
+            "cached_queries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "fetched_ranges": self.fetched_ranges,
+        }
@@ -0,0 +1,121 @@
+"""Backoff, circuit breaker and rate budget guarding the Sutro API."""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random | None = None) -> float:
+    """Seconds to wait before retry number `attempt` (from 0), with full jitter."""
+    return (rng or random).uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Stops requests to an API that keeps failing
+
+    After `threshold` consecutive failures the circuit opens and requests are
+    refused for `reset_timeout` seconds. A single probe is then let through,
+    its outcome closes or reopens the circuit.
+    """
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.opens = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Closed, open, or half open once the reset timeout passed."""
+        if self.opened_at is None:
+            return CIRCUIT_CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until a probe is allowed, 0 when requests may be sent."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Returns true when a request may be sent now."""
+        state = self.state
+        if state == CIRCUIT_CLOSED:
+            return True
+        if state == CIRCUIT_HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """The API answered, the circuit closes."""
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """The API could not be reached, repeated failures open the circuit."""
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            if self.opened_at is None or self._probing:
+                self.opens += 1
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """A request ended without an outcome, another probe may be sent."""
+        self._probing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the breaker state in a JSON-serializable form."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "retry_after": round(self.retry_after, 1),
+        }
+
+
+class TokenBucket:
+    """Rate budget of `rate` requests per second with bursts up to `capacity`
+
+    Waiters are served in arrival order.
+    """
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def async_acquire(self) -> float:
+        """Takes one token, waiting for it if the budget is spent.
+
+        Returns:
+            float: seconds spent waiting
+        """
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= 1
+        return waited
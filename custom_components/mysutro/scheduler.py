@@ -0,0 +1,78 @@
+"""Adaptive poll scheduling driven by the device's test schedule."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ADAPTIVE_EARLY,
+    ADAPTIVE_HEARTBEAT,
+    ADAPTIVE_LATE,
+    TEST_TIMES_REFRESH,
+)
+
+
+class MySutroPollScheduler:
+    """Chooses the next poll interval from the test hours and the last reading
+
+    Polls every `fast_interval` from shortly before an expected reading until it
+    lands (or the reading is considered skipped), and only sends a heartbeat poll
+    every `ADAPTIVE_HEARTBEAT` seconds in between.
+
+    Args:
+        fast_interval (timedelta): interval used around an expected reading
+    """
+    def __init__(self, fast_interval: timedelta) -> None:
+        self.fast_interval = fast_interval
+        self.heartbeat = timedelta(seconds=ADAPTIVE_HEARTBEAT)
+        self.early = timedelta(seconds=ADAPTIVE_EARLY)
+        self.late = timedelta(seconds=ADAPTIVE_LATE)
+        self.test_hours: list[int] = []
+        self.test_hours_updated: datetime | None = None
+
+    def needs_test_times(self, now: datetime) -> bool:
+        """Returns true when the test schedule should be fetched again."""
+        return (
+            self.test_hours_updated is None
+            or now - self.test_hours_updated >= timedelta(seconds=TEST_TIMES_REFRESH)
+        )
+
+    def set_test_hours(self, hours: list[int], now: datetime) -> None:
+        """Stores the hours of day the device takes its readings."""
+        self.test_hours = sorted(hours)
+        self.test_hours_updated = now
+
+    def _next_test_time(self, after: datetime) -> datetime:
+        """Returns the first scheduled test strictly after the given time."""
+        local = dt_util.as_local(after)
+        day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        for offset in range(3):
+            for hour in self.test_hours:
+                candidate = (day + timedelta(days=offset)).replace(hour=hour)
+                if candidate > local:
+                    return candidate
+        return day + timedelta(days=3)
+
+    def next_expected_reading(self, last_reading: datetime | None, now: datetime) -> datetime | None:
+        """Returns the test time the next reading is expected from.
+
+        Test times that passed more than `ADAPTIVE_LATE` ago without a reading are
+        treated as skipped.
+        """
+        if not self.test_hours:
+            return None
+        reference = last_reading or now
+        if reference < now - self.late:
+            reference = now - self.late
+        return self._next_test_time(reference)
+
+    def next_interval(self, last_reading: datetime | None, now: datetime) -> timedelta:
+        """Returns how long to wait before the next poll."""
+        expected = self.next_expected_reading(last_reading, now)
+        if expected is None:
+            return self.fast_interval
+        window_open = expected - self.early
+        if now >= window_open:
+            return self.fast_interval
+        return max(self.fast_interval, min(self.heartbeat, window_open - now))
@@ -1,22 +1,148 @@
 """ Represents a sensor entity for the Sutro device """
 
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import datetime
 import logging
+import math
 from typing import Any
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTemperature, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-import dateutil.parser
 from . import MySutroEntity
 from .const import DOMAIN, PROP_MAP
+from .generated import Chemical
+from .metrics import RequestMetrics
+from .trends import TREND_KEYS
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class MySutroSensorEntityDescription(SensorEntityDescription):
+    """ Describes a sensor fed from the device telemetry """
+    value_fn: Callable[[Any], Any] = lambda value: value
+
+
+DEVICE_SENSORS: tuple[MySutroSensorEntityDescription, ...] = (
+    MySutroSensorEntityDescription(
+        key="batteryLevel",
+        name="battery level",
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    MySutroSensorEntityDescription(
+        key="temperature",
+        name="water temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    MySutroSensorEntityDescription(
+        key="cartridgeCharges",
+        name="cartridge charges",
+        icon="mdi:test-tube",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    MySutroSensorEntityDescription(
+        key="lastMessage",
+        name="last message",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    MySutroSensorEntityDescription(
+        key="health",
+        name="health",
+        device_class=SensorDeviceClass.ENUM,
+        options=["good", "needs_calibration", "needs_service"],
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda value: value.lower() if value else None,
+    ),
+    MySutroSensorEntityDescription(
+        key="wentUnderThresholdAt",
+        name="cartridge low since",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    MySutroSensorEntityDescription(
+        key="subscriptionState",
+        name="subscription",
+        device_class=SensorDeviceClass.ENUM,
+        options=["active", "cancelled", "expiring", "payment_failed", "uninitialized"],
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda value: value.lower() if value else None,
+    ),
+)
+
+# Recommendation type -> the chemistry value it is about
+RECOMMENDATION_TYPES = {"PH": "ph", "CHLORINE": "chlorine", "ALKALINITY": "alkalinity"}
+
+# (Recommendation type, decision) -> the ChemicalType of products that treat it
+TREATMENT_TYPES = {
+    ("PH", "LOW"): "PH_UP",
+    ("PH", "HIGH"): "PH_DOWN",
+    ("ALKALINITY", "LOW"): "ALKALINITY_UP",
+    ("CHLORINE", "LOW"): "PRIMARY_SANITIZER",
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class MySutroMetricSensorEntityDescription(SensorEntityDescription):
+    """ Describes a sensor fed from the gateway's request metrics """
+    value_fn: Callable[[RequestMetrics], Any]
+
+
+METRIC_SENSORS: tuple[MySutroMetricSensorEntityDescription, ...] = (
+    MySutroMetricSensorEntityDescription(
+        key="api_latency",
+        name="api latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: round(metrics.last_latency * 1000, 1) if metrics.last_latency is not None else None,
+    ),
+    MySutroMetricSensorEntityDescription(
+        key="api_last_success",
+        name="api last success",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.last_success,
+    ),
+    MySutroMetricSensorEntityDescription(
+        key="api_requests",
+        name="api requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.requests,
+    ),
+    MySutroMetricSensorEntityDescription(
+        key="api_failures",
+        name="api failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.failures,
+    ),
+)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddConfigEntryEntitiesCallback) -> None: # pylint: disable=line-too-long
     """Set up entry."""
     entities = []
@@ -32,6 +158,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 
     entities.append(MySutroTimeStamp(coordinator, 'readingTime'))
 
+    for description in DEVICE_SENSORS:
+        entities.append(MySutroDeviceSensor(coordinator, description))
+
+    for recommendation_type in RECOMMENDATION_TYPES:
+        entities.append(MySutroRecommendationSensor(coordinator, recommendation_type))
+
+    for trend_key in TREND_KEYS:
+        entities.append(MySutroTrendSensor(coordinator, trend_key))
+
+    for description in METRIC_SENSORS:
+        entities.append(MySutroMetricSensor(coordinator, description))
+
     async_add_entities(entities)
 
 
@@ -53,15 +191,8 @@ class MySutroSensor(MySutroEntity, SensorEntity):
         return f"{super().unique_id}_{self._data_key}"
 
     @property
-    def value(self) -> float:
-        """ Returns the value of the sensor """
-        # return self.gateway.data.me.pool.latestReading
-        return self.gateway.data[self._data_key]
-
-    @property
-    def native_value(self) -> float:
-        # return self.gateway.data.me.pool.latestReading
-        return self.gateway.data[self._data_key]
+    def native_value(self) -> float | None:
+        return self.value
 
     @property
     def data_valid(self) -> bool:
@@ -85,12 +216,7 @@ class MySutroTimeStamp(MySutroEntity, SensorEntity):
         return f"{super().unique_id}_{self._data_key}"
 
     @property
-    def value(self) -> datetime.datetime:
-        """ Returns value as timestamp """
-        return dateutil.parser.parse(self.gateway.data[self._data_key])
-
-    @property
-    def native_value(self) -> datetime.datetime:
+    def native_value(self) -> datetime.datetime | None:
         """ Returns value as timestamp """
         return self.value
 
@@ -98,3 +224,137 @@ class MySutroTimeStamp(MySutroEntity, SensorEntity):
     def data_valid(self) -> bool:
         """ Returns true is data is valid, always true """
         return True
+
+
+class MySutroDeviceSensor(MySutroEntity, SensorEntity):
+    """ Represents a telemetry value reported by the sutro device """
+    entity_description: MySutroSensorEntityDescription
+
+    def __init__(self, coordinator: DataUpdateCoordinator, description: MySutroSensorEntityDescription) -> None:
+        super().__init__(coordinator, description.key)
+        self.entity_description = description
+
+    @property
+    def native_value(self) -> Any:
+        """ Returns the telemetry value """
+        return self.entity_description.value_fn(self.value)
+
+
+class MySutroMetricSensor(MySutroEntity, SensorEntity):
+    """ Represents a request metric of the gateway """
+    entity_description: MySutroMetricSensorEntityDescription
+
+    def __init__(self, coordinator: DataUpdateCoordinator, description: MySutroMetricSensorEntityDescription) -> None:
+        super().__init__(coordinator, description.key)
+        self.entity_description = description
+        self._enabled_default = description.entity_registry_enabled_default
+        # Metrics move on every poll, listen without a context to get each update
+        self.coordinator_context = None
+
+    @property
+    def native_value(self) -> Any:
+        """ Returns the metric value """
+        return self.entity_description.value_fn(self.gateway.metrics)
+
+
+class MySutroTrendSensor(MySutroEntity, SensorEntity):
+    """ Represents the rolling average of a chemistry value, e.g. ph over 24h """
+    def __init__(self, coordinator: DataUpdateCoordinator, trend_key: str) -> None:
+        super().__init__(coordinator, trend_key)
+        key = TREND_KEYS[trend_key]
+        window = trend_key.rsplit("_", 1)[1]
+        self._attr_name = f"{key} {window} average"
+        self._attr_native_unit_of_measurement = PROP_MAP[key]['unit']
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_suggested_display_precision = round(-math.log10(PROP_MAP[key]['step']))
+        self._attr_icon = "mdi:chart-bell-curve-cumulative"
+
+    @property
+    def native_value(self) -> float | None:
+        """ Returns the mean of the window """
+        return self.coordinator.trends.stats(self._data_key)["mean"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """ Min, max, slope per day and sample count of the window """
+        stats = self.coordinator.trends.stats(self._data_key)
+        attributes = {
+            "min": stats["min"],
+            "max": stats["max"],
+            "slope_per_day": round(stats["slope"], 4) if stats["slope"] is not None else None,
+            "samples": stats["samples"],
+        }
+        return {**(super().extra_state_attributes or {}), **attributes}
+
+
+class MySutroRecommendationSensor(MySutroEntity, SensorEntity):
+    """ Represents SutroAI's current advice for one chemistry value """
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = ["low", "ok", "high"]
+    _attr_icon = "mdi:flask-outline"
+
+    def __init__(self, coordinator: DataUpdateCoordinator, recommendation_type: str) -> None:
+        super().__init__(coordinator, "latestRecommendations")
+        self._recommendation_type = recommendation_type
+        self._key = RECOMMENDATION_TYPES[recommendation_type]
+        self._attr_name = f"{self._key} recommendation"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{self.mac}_recommendation_{self._key}"
+
+    @property
+    def recommendation(self):
+        """The current recommendation of this type, if any."""
+        for recommendation in self.value or ():
+            if recommendation.type == self._recommendation_type and recommendation.current:
+                return recommendation
+        return None
+
+    def _product(self, recommendation) -> Chemical | None:
+        """The recommended product from the chemical catalog.
+
+        Without a product in the recommendation, the catalog's generic product
+        for the treatment is used.
+        """
+        catalog = self.coordinator.catalog
+        if recommendation.chemical_id or recommendation.chemical_upc:
+            return catalog.resolve(recommendation.chemical_id, recommendation.chemical_upc)
+        treatment_type = TREATMENT_TYPES.get((recommendation.type, recommendation.decision))
+        if treatment_type is None:
+            return None
+        return next((chemical for chemical in catalog.by_type(treatment_type) if chemical.generic), None)
+
+    @property
+    def native_value(self) -> str | None:
+        """ Returns how the reading compares to the target: low, ok or high """
+        recommendation = self.recommendation
+        return recommendation.decision.lower() if recommendation and recommendation.decision else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """ Treatment, explanation, the product from the catalog and the pool profile's target range """
+        attributes = dict(super().extra_state_attributes or {})
+        recommendation = self.recommendation
+        if recommendation is not None:
+            attributes.update({
+                "treatment": recommendation.treatment,
+                "explanation": recommendation.explanation,
+                "chemical": recommendation.chemical_name,
+            })
+            product = self._product(recommendation)
+            if product is not None:
+                attributes.update({
+                    "chemical": recommendation.chemical_name or product.name,
+                    "chemical_upc": product.upc,
+                    "chemical_manufacturer": product.manufacturer,
+                    "chemical_package": " ".join(
+                        part for part in (product.package_size, product.package_size_unit) if part
+                    ) or None,
+                })
+        data = self.coordinator.data
+        if data and data.conflict_warning:
+            attributes["conflict_warning"] = data.conflict_warning
+        if data and data.pool_profile:
+            attributes.update(data.pool_profile.target_range(self._key))
+        return attributes or None
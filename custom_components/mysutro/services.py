@@ -0,0 +1,164 @@
+"""Services of the mySutro integration."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    PROFILE_DEFAULT_DURATION,
+    PROFILE_MAX_DURATION,
+    READING_TYPES,
+)
+from .gateway import MySutroError
+
+SERVICE_EXPORT_HISTORY = "export_history"
+SERVICE_GET_READINGS = "get_readings"
+SERVICE_PROFILE = "profile"
+SERVICE_REQUEST_READING = "request_reading"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required("path"): cv.string,
+        vol.Optional("format", default=EXPORT_FORMAT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+    }
+)
+
+GET_READINGS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+    }
+)
+
+REQUEST_READING_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional("reading_type", default=READING_TYPES[0]): vol.In(READING_TYPES),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("duration", default=PROFILE_DEFAULT_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=PROFILE_MAX_DURATION)
+        ),
+    }
+)
+
+
+def _coordinator(hass: HomeAssistant, call: ServiceCall):
+    """Returns the coordinator of the config entry a call targets."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+    if entry_data is None:
+        raise ServiceValidationError(f"No loaded mySutro entry {entry_id}")
+    return entry_data["coordinator"]
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Registers the integration's services."""
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Streams a pool's readings to a CSV file or a Parquet directory."""
+        coordinator = _coordinator(hass, call)
+        path = hass.config.path(call.data["path"])
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Writing to {path} is not allowed, add it to allowlist_external_dirs")
+        # Only an export needs the writers, keep them out of the startup import
+        from .export import async_export_readings, create_writer  # pylint: disable=import-outside-toplevel
+
+        start = call.data.get("start")
+        end = call.data.get("end")
+        try:
+            writer = await hass.async_add_executor_job(create_writer, path, call.data["format"])
+            result = await async_export_readings(
+                coordinator.gateway,
+                coordinator.pool_id,
+                writer,
+                dt_util.as_utc(start) if start else None,
+                dt_util.as_utc(end) if end else None,
+                run_blocking=hass.async_add_executor_job,
+            )
+        except MySutroError as ex:
+            raise HomeAssistantError(f"Export failed: {ex}") from ex
+        return result.as_dict()
+
+    async def async_get_readings(call: ServiceCall) -> ServiceResponse:
+        """Returns a pool's readings between two times from the local store."""
+        coordinator = _coordinator(hass, call)
+        end = call.data.get("end")
+        try:
+            readings = await coordinator.reading_store.async_get_readings(
+                dt_util.as_utc(call.data["start"]), dt_util.as_utc(end) if end else None
+            )
+        except MySutroError as ex:
+            raise HomeAssistantError(f"Could not load readings: {ex}") from ex
+        return {
+            "pool_id": coordinator.pool_id,
+            "readings": [reading.as_dict() for reading in readings],
+        }
+
+    async def async_request_reading(call: ServiceCall) -> ServiceResponse:
+        """Asks the device for a reading and polls quickly until it lands."""
+        coordinator = _coordinator(hass, call)
+        try:
+            result = await coordinator.async_request_reading(call.data["reading_type"].upper())
+        except MySutroError as ex:
+            raise HomeAssistantError(f"Could not request a reading: {ex}") from ex
+        return {
+            "result": result,
+            "burst_until": coordinator.burst_until.isoformat() if coordinator.burst_until else None,
+        }
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profiles the integration's code on the event loop for a while."""
+        from .profiling import async_capture_profile  # pylint: disable=import-outside-toplevel
+
+        try:
+            return await async_capture_profile(
+                call.data["duration"], run_blocking=hass.async_add_executor_job
+            )
+        except MySutroError as ex:
+            raise HomeAssistantError(f"Profiling failed: {ex}") from ex
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_READINGS,
+        async_get_readings,
+        schema=GET_READINGS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REQUEST_READING,
+        async_request_reading,
+        schema=REQUEST_READING_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
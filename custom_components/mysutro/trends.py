@@ -0,0 +1,191 @@
+"""Rolling chemistry statistics, updated in constant time per reading."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from .const import PROP_MAP
+from .generated import HistoricalReading
+
+# Window name -> span in seconds
+TREND_WINDOWS = {"24h": 86400, "7d": 7 * 86400}
+
+# Trend key -> the reading field it follows, e.g. "ph_24h" -> "ph"
+TREND_KEYS = {f"{key}_{window}": key for key in PROP_MAP for window in TREND_WINDOWS}
+
+SECONDS_PER_DAY = 86400
+
+
+class RollingWindow:
+    """Mean, min, max and least-squares slope of the values of a time span
+
+    Values must arrive in time order. Running sums give the mean and slope,
+    monotonic deques give min and max, so adding a value costs O(1)
+    amortized whatever the window holds.
+    """
+    def __init__(self, span: float) -> None:
+        self.span = span
+        self._values: deque[tuple[float, float]] = deque()
+        self._min: deque[tuple[float, float]] = deque()
+        self._max: deque[tuple[float, float]] = deque()
+        self._origin: float | None = None
+        self._sum_v = 0.0
+        self._sum_t = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Adds a value and drops the ones that fell out of the window."""
+        if self._origin is None:
+            # Times are kept in days from the first value, the sums stay well conditioned
+            self._origin = timestamp
+        t = (timestamp - self._origin) / SECONDS_PER_DAY
+        self._values.append((t, value))
+        self._sum_v += value
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((t, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((t, value))
+        self._expire(t - self.span / SECONDS_PER_DAY)
+
+    def expire(self, timestamp: float) -> bool:
+        """Drops the values older than the span before timestamp.
+
+        Returns:
+            bool: true when values were dropped
+        """
+        if self._origin is None:
+            return False
+        count = len(self._values)
+        self._expire((timestamp - self._origin - self.span) / SECONDS_PER_DAY)
+        return len(self._values) != count
+
+    def _expire(self, oldest: float) -> None:
+        while self._values and self._values[0][0] < oldest:
+            t, value = self._values.popleft()
+            self._sum_v -= value
+            self._sum_t -= t
+            self._sum_tt -= t * t
+            self._sum_tv -= t * value
+        while self._min and self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max and self._max[0][0] < oldest:
+            self._max.popleft()
+        if not self._values:
+            self._origin = None
+            self._sum_v = self._sum_t = self._sum_tt = self._sum_tv = 0.0
+
+    @property
+    def mean(self) -> float | None:
+        return self._sum_v / len(self._values) if self._values else None
+
+    @property
+    def min(self) -> float | None:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> float | None:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def slope(self) -> float | None:
+        """Change per day of the fitted line, None below two distinct times."""
+        n = len(self._values)
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 1e-12:
+            return None
+        return (n * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+    def samples(self) -> list[tuple[float, float]]:
+        """Returns the (timestamp, value) pairs in the window, oldest first."""
+        origin = self._origin or 0.0
+        return [(origin + t * SECONDS_PER_DAY, value) for t, value in self._values]
+
+
+class MySutroTrends:
+    """Rolling statistics of every chemistry value over each trend window
+
+    Readings flagged with invalidatingTrends may be wrong and are left out.
+    """
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self.last_reading: datetime | None = None
+        self._windows = {
+            trend_key: RollingWindow(TREND_WINDOWS[trend_key.rsplit("_", 1)[1]])
+            for trend_key in TREND_KEYS
+        }
+
+    def add_reading(self, reading_time: datetime | None, values: dict[str, Any] | HistoricalReading, invalid: bool = False) -> bool:
+        """Adds one reading newer than the last one.
+
+        Returns:
+            bool: true when the reading was new
+        """
+        if reading_time is None or (self.last_reading is not None and reading_time <= self.last_reading):
+            return False
+        self.last_reading = reading_time
+        if invalid:
+            return True
+        timestamp = reading_time.timestamp()
+        for trend_key, key in TREND_KEYS.items():
+            value = values.get(key)
+            if value is not None:
+                self._windows[trend_key].add(timestamp, float(value))
+        return True
+
+    def expire(self, now: datetime) -> set[str]:
+        """Ages the windows to now, without a new reading nothing else drops old values.
+
+        Returns:
+            set[str]: the trend keys whose window changed
+        """
+        timestamp = now.timestamp()
+        return {trend_key for trend_key, window in self._windows.items() if window.expire(timestamp)}
+
+    def seed(self, readings: Iterable[tuple[datetime, HistoricalReading, bool]]) -> None:
+        """Rebuilds the windows from older readings, keeping the ones added since.
+
+        Args:
+            readings: (reading time, values, invalid) in any order
+        """
+        live = {
+            trend_key: window.samples() for trend_key, window in self._windows.items()
+        }
+        last_live = self.last_reading
+        self._reset()
+        for reading_time, values, invalid in sorted(readings, key=lambda item: item[0]):
+            if last_live is None or reading_time < last_live:
+                self.add_reading(reading_time, values, invalid)
+        # Readings that arrived live are replayed after the seeded ones
+        for trend_key, samples in live.items():
+            window = self._windows[trend_key]
+            for timestamp, value in samples:
+                if self.last_reading is None or timestamp > self.last_reading.timestamp():
+                    window.add(timestamp, value)
+        if last_live is not None and (self.last_reading is None or last_live > self.last_reading):
+            self.last_reading = last_live
+
+    def stats(self, trend_key: str) -> dict[str, Any]:
+        """Returns mean, min, max, slope per day and sample count of a trend key."""
+        window = self._windows[trend_key]
+        return {
+            "mean": window.mean,
+            "min": window.min,
+            "max": window.max,
+            "slope": window.slope,
+            "samples": len(window),
+        }
@@ -0,0 +1,20 @@
+"""Tests of the chemical catalog lookups."""
+import pytest
+
+from custom_components.mysutro.catalog import upc_key
+
+
+@pytest.mark.parametrize(
+    ("upc", "expected"),
+    [
+        ("012345678905", "12345678905"),
+        ("0012345678905", "12345678905"),
+        ("0-12345-67890-5", "12345678905"),
+        (" 12345678905 ", "12345678905"),
+        ("000", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_upc_key(upc, expected):
+    assert upc_key(upc) == expected
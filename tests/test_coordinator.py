@@ -0,0 +1,120 @@
+"""Tests of the coordinator's change-filtered listener updates."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.mysutro import MySutroDataUpdateCoordinator
+from custom_components.mysutro.const import DOMAIN
+from custom_components.mysutro.gateway import MySutroError, MySutroGateway
+
+POOL_ID = "1000"
+
+
+def _pool(ph: float = 7.4, battery: int = 80, reading_time=None) -> dict:
+    reading_time = reading_time or dt_util.utcnow() - timedelta(hours=1)
+    return {
+        "id": POOL_ID,
+        "latestReading": {"ph": ph, "chlorine": 2.5, "readingTime": reading_time.isoformat()},
+        "device": {"batteryLevel": battery, "online": True},
+    }
+
+
+@pytest.fixture
+def gateway():
+    gateway = MySutroGateway(MagicMock(), "token")
+    gateway.pools = {POOL_ID: {}}
+    gateway.async_api_request = AsyncMock()
+    return gateway
+
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant, gateway):
+    entry = MockConfigEntry(domain=DOMAIN, data={"token": "token", "pool_id": POOL_ID})
+    entry.add_to_hass(hass)
+    reading_store = MagicMock()
+    reading_store.async_add_latest = AsyncMock()
+    coordinator = MySutroDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        gateway=gateway,
+        api_lock=asyncio.Lock(),
+        pool_id=POOL_ID,
+        reading_store=reading_store,
+        catalog=None,
+    )
+    yield coordinator
+    # Listeners schedule the next poll
+    await coordinator.async_shutdown()
+
+
+def _listen(coordinator, contexts) -> dict:
+    calls = {context: 0 for context in contexts}
+
+    def listener(context):
+        def update():
+            calls[context] += 1
+        return update
+
+    for context in contexts:
+        coordinator.async_add_listener(listener(context), context)
+    return calls
+
+
+async def test_only_listeners_of_changed_fields_are_updated(coordinator):
+    calls = _listen(coordinator, ["ph", "batteryLevel", None])
+    coordinator._changed_keys = {"ph"}
+    coordinator.async_update_listeners()
+    assert calls == {"ph": 1, "batteryLevel": 0, None: 1}
+    assert coordinator.update_stats == {"delivered_updates": 2, "suppressed_updates": 1}
+
+
+async def test_unknown_changes_update_every_listener(coordinator):
+    calls = _listen(coordinator, ["ph", "batteryLevel", None])
+    coordinator._changed_keys = None
+    coordinator.async_update_listeners()
+    assert calls == {"ph": 1, "batteryLevel": 1, None: 1}
+
+
+async def test_changed_keys_apply_to_one_dispatch(coordinator):
+    calls = _listen(coordinator, ["ph", "batteryLevel"])
+    coordinator._changed_keys = {"ph"}
+    coordinator.async_update_listeners()
+    coordinator.async_update_listeners()
+    assert calls == {"ph": 2, "batteryLevel": 1}
+
+
+async def test_refresh_updates_the_listeners_of_changed_fields(coordinator, gateway):
+    reading_time = dt_util.utcnow() - timedelta(hours=1)
+    gateway.async_api_request.return_value = {"data": {"p1000": _pool(reading_time=reading_time)}}
+    calls = _listen(coordinator, ["ph", "chlorine", "batteryLevel", "ph_24h", None])
+    await coordinator.async_refresh()
+    assert calls == {"ph": 1, "chlorine": 1, "batteryLevel": 1, "ph_24h": 1, None: 1}
+
+    gateway.async_api_request.return_value = {"data": {"p1000": _pool(battery=79, reading_time=reading_time)}}
+    gateway.last_update = None
+    await coordinator.async_refresh()
+    assert calls == {"ph": 1, "chlorine": 1, "batteryLevel": 2, "ph_24h": 1, None: 2}
+
+    # A new reading moves every trend window, even with the same values
+    gateway.async_api_request.return_value = {
+        "data": {"p1000": _pool(battery=79, reading_time=reading_time + timedelta(minutes=30))}
+    }
+    gateway.last_update = None
+    await coordinator.async_refresh()
+    assert calls == {"ph": 1, "chlorine": 1, "batteryLevel": 2, "ph_24h": 2, None: 3}
+
+
+async def test_failed_refresh_updates_every_listener(coordinator, gateway):
+    gateway.async_api_request.return_value = {"data": {"p1000": _pool()}}
+    await coordinator.async_refresh()
+    calls = _listen(coordinator, ["ph", "batteryLevel"])
+    gateway.async_api_request.side_effect = MySutroError("Service unavailable")
+    gateway.last_update = None
+    await coordinator.async_refresh()
+    assert calls == {"ph": 1, "batteryLevel": 1}
@@ -0,0 +1,74 @@
+"""Tests of the windowed history iteration shared by the export and the store."""
+from datetime import datetime, timedelta, timezone
+
+from custom_components.mysutro.const import EXPORT_WINDOW, HISTORY_PAGE_SIZE
+from custom_components.mysutro.export import async_iter_readings
+from custom_components.mysutro.generated import HistoricalReading
+
+START = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class FakeGateway:
+    """Serves historical readings the way the API pages them, newest first."""
+
+    def __init__(self, readings: list[HistoricalReading]) -> None:
+        self.readings = readings
+        self.requests: list[tuple[datetime, datetime]] = []
+
+    async def async_get_historical_readings(self, pool_id, start, end, limit):
+        start, end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        self.requests.append((start, end))
+        matching = [reading for reading in self.readings if start <= reading.reading_time <= end]
+        return sorted(matching, key=lambda reading: reading.reading_time, reverse=True)[:limit]
+
+
+def _hourly(hours: int) -> list[HistoricalReading]:
+    return [
+        HistoricalReading(ph=7.0 + hour % 10 / 10, reading_time=START + timedelta(hours=hour))
+        for hour in range(hours)
+    ]
+
+
+async def _collect(gateway, start, end) -> list[list[HistoricalReading]]:
+    return [batch async for batch in async_iter_readings(gateway, "1000", start, end)]
+
+
+async def test_every_reading_once_in_time_order():
+    readings = _hourly(15 * 24)
+    gateway = FakeGateway(readings)
+    batches = await _collect(gateway, START, START + timedelta(days=15))
+    assert [reading for batch in batches for reading in batch] == readings
+    for batch in batches:
+        assert batch == sorted(batch, key=lambda reading: reading.reading_time)
+
+
+async def test_walks_forward_a_window_at_a_time():
+    gateway = FakeGateway(_hourly(15 * 24))
+    batches = await _collect(gateway, START, START + timedelta(days=15))
+    assert len(batches) == 3
+    assert all(len(batch) <= EXPORT_WINDOW * 24 + 1 for batch in batches)
+    window_starts = sorted({start for start, _ in gateway.requests})
+    assert window_starts == [START + timedelta(days=days) for days in (0, EXPORT_WINDOW, 2 * EXPORT_WINDOW)]
+
+
+async def test_pages_backwards_within_a_window():
+    gateway = FakeGateway(_hourly(EXPORT_WINDOW * 24))
+    await _collect(gateway, START, START + timedelta(days=EXPORT_WINDOW))
+    assert len(gateway.requests) == -(-EXPORT_WINDOW * 24 // HISTORY_PAGE_SIZE)
+    ends = [end for _, end in gateway.requests]
+    assert ends == sorted(ends, reverse=True)
+
+
+async def test_reading_on_a_window_boundary_is_yielded_once():
+    boundary = START + timedelta(days=EXPORT_WINDOW)
+    readings = [
+        HistoricalReading(ph=7.1, reading_time=boundary - timedelta(hours=1)),
+        HistoricalReading(ph=7.2, reading_time=boundary),
+        HistoricalReading(ph=7.3, reading_time=boundary + timedelta(hours=1)),
+    ]
+    batches = await _collect(FakeGateway(readings), START, START + timedelta(days=2 * EXPORT_WINDOW))
+    assert [reading for batch in batches for reading in batch] == readings
+
+
+async def test_empty_range_yields_nothing():
+    assert await _collect(FakeGateway(_hourly(24)), START + timedelta(days=3), START + timedelta(days=4)) == []
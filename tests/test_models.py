@@ -0,0 +1,92 @@
+"""Tests of the typed pool snapshot."""
+from datetime import datetime, timezone
+
+from custom_components.mysutro.models import FIELD_ATTRIBUTES, ManualReading, PoolSnapshot
+
+POOL = {
+    "id": "1000",
+    "latestReading": {"ph": 7.4, "chlorine": 2.5, "readingTime": "2024-06-03T08:00:00Z"},
+    "latestRecommendations": {
+        "conflictWarning": "Chlorine is high",
+        "recommendations": [{"id": "r1", "type": "PH_DOWN", "decision": None}],
+    },
+    "poolProfile": {"id": "profile", "phTarget": 7.5},
+    "device": {
+        "batteryLevel": 80,
+        "online": True,
+        "cartridgeShipmentData": {"currentlyEligibleForShipment": True, "wentUnderThresholdAt": None},
+        "subscription": {"state": "ACTIVE"},
+        "manualReadingsInProgress": [{"id": "m1", "status": "READING_ACKED_IN_PROGRESS"}],
+    },
+}
+ALL_TIERS = frozenset({"recommendations", "cartridge", "profile", "manual"})
+
+
+def test_from_pool_decodes_reading_and_device():
+    snapshot = PoolSnapshot.from_pool("1000", POOL)
+    assert snapshot.pool_id == "1000"
+    assert snapshot.ph == 7.4
+    assert snapshot.chlorine == 2.5
+    assert snapshot.reading_time == datetime(2024, 6, 3, 8, tzinfo=timezone.utc)
+    assert snapshot.battery_level == 80
+    assert snapshot.online is True
+    assert snapshot.temperature is None
+    assert snapshot.manual_readings == (ManualReading(id="m1", status="READING_ACKED_IN_PROGRESS"),)
+
+
+def test_from_pool_decodes_fetched_tiers():
+    snapshot = PoolSnapshot.from_pool("1000", POOL, ALL_TIERS)
+    assert snapshot.conflict_warning == "Chlorine is high"
+    assert [recommendation.id for recommendation in snapshot.recommendations] == ["r1"]
+    assert snapshot.cartridge_eligible is True
+    assert snapshot.subscription_state == "ACTIVE"
+    assert snapshot.pool_profile.ph_target == 7.5
+
+
+def test_from_pool_ignores_tiers_not_fetched():
+    snapshot = PoolSnapshot.from_pool("1000", POOL)
+    assert snapshot.conflict_warning is None
+    assert snapshot.recommendations == ()
+    assert snapshot.subscription_state is None
+    assert snapshot.pool_profile is None
+
+
+def test_from_pool_carries_tiers_over_from_previous():
+    previous = PoolSnapshot.from_pool("1000", POOL, ALL_TIERS)
+    pool = {**POOL, "latestReading": {**POOL["latestReading"], "ph": 7.2}}
+    snapshot = PoolSnapshot.from_pool("1000", pool, frozenset({"manual"}), previous)
+    assert snapshot.ph == 7.2
+    assert snapshot.conflict_warning == previous.conflict_warning
+    assert snapshot.recommendations == previous.recommendations
+    assert snapshot.subscription_state == "ACTIVE"
+    assert snapshot.pool_profile == previous.pool_profile
+
+
+def test_from_pool_replaces_fetched_tiers():
+    previous = PoolSnapshot.from_pool("1000", POOL, ALL_TIERS)
+    pool = {**POOL, "latestRecommendations": {"conflictWarning": None, "recommendations": []}}
+    snapshot = PoolSnapshot.from_pool("1000", pool, frozenset({"recommendations"}), previous)
+    assert snapshot.conflict_warning is None
+    assert snapshot.recommendations == ()
+
+
+def test_as_dict_round_trips():
+    snapshot = PoolSnapshot.from_pool("1000", POOL, ALL_TIERS)
+    assert PoolSnapshot.from_dict("1000", snapshot.as_dict()) == snapshot
+
+
+def test_changed_fields_without_previous_is_everything():
+    snapshot = PoolSnapshot.from_pool("1000", POOL)
+    assert snapshot.changed_fields(None) == set(FIELD_ATTRIBUTES)
+
+
+def test_changed_fields_names_the_api_fields_that_differ():
+    previous = PoolSnapshot.from_pool("1000", POOL)
+    pool = {
+        **POOL,
+        "latestReading": {**POOL["latestReading"], "ph": 7.2},
+        "device": {**POOL["device"], "online": False},
+    }
+    snapshot = PoolSnapshot.from_pool("1000", pool)
+    assert snapshot.changed_fields(previous) == {"ph", "online"}
+    assert snapshot.changed_fields(snapshot) == set()
@@ -0,0 +1,61 @@
+"""Tests of the field-minimal query compiler."""
+import hashlib
+
+from custom_components.mysutro.query import (
+    ALL_FIELDS,
+    compile_pools_query,
+    required_fields,
+    wanted_tiers,
+)
+
+
+def test_required_fields_keeps_string_contexts():
+    assert required_fields(["ph", None, "batteryLevel", object(), "ph"]) == frozenset({"ph", "batteryLevel"})
+    assert required_fields([]) == frozenset()
+
+
+def test_query_selects_only_requested_fields():
+    query = compile_pools_query(("1000",), frozenset({"ph", "batteryLevel"}))
+    assert "latestReading { ph readingTime }" in query.document
+    assert "device { batteryLevel }" in query.document
+    assert "chlorine" not in query.document
+    assert "temperature" not in query.document
+
+
+def test_query_always_selects_reading_time():
+    query = compile_pools_query(("1000",), frozenset({"temperature"}))
+    assert "latestReading { readingTime }" in query.document
+
+
+def test_query_aliases_every_pool_in_a_stable_order():
+    query = compile_pools_query(("2000", "1000"), frozenset({"ph"}))
+    assert query.document.index("p1000: getPool(poolId: 1000)") < query.document.index("p2000: getPool(poolId: 2000)")
+    assert compile_pools_query(("1000", "2000"), frozenset({"ph"})).document == query.document
+
+
+def test_query_adds_the_selection_of_due_tiers():
+    fields = frozenset({"ph", "manualReadingsInProgress"})
+    assert wanted_tiers(fields) == frozenset({"manual"})
+    query = compile_pools_query(("1000",), fields, frozenset({"manual", "profile"}))
+    assert "manualReadingsInProgress { id status }" in query.document
+    assert "poolProfile { id" in query.document
+    assert "latestRecommendations" not in query.document
+
+
+def test_persisted_query_hash_matches_the_document():
+    query = compile_pools_query(("1000",), ALL_FIELDS)
+    assert query.sha256 == hashlib.sha256(query.document.encode()).hexdigest()
+    assert query.extensions == {"persistedQuery": {"version": 1, "sha256Hash": query.sha256}}
+    assert query.operation_name == "MySutroPools"
+    assert query.document.startswith("query MySutroPools {")
+
+
+def test_persisted_query_hash_changes_with_the_selection():
+    ph = compile_pools_query(("1000",), frozenset({"ph"}))
+    chlorine = compile_pools_query(("1000",), frozenset({"chlorine"}))
+    assert ph.sha256 != chlorine.sha256
+
+
+def test_compiled_queries_are_cached():
+    fields = frozenset({"ph", "online"})
+    assert compile_pools_query(("1000",), fields) is compile_pools_query(("1000",), fields)
@@ -0,0 +1,49 @@
+"""Tests of the covered-range bookkeeping of the reading store."""
+from custom_components.mysutro.reading_store import merge_range, missing_ranges
+
+
+def test_merge_range_into_nothing():
+    assert merge_range([], 10, 20) == [(10, 20)]
+
+
+def test_merge_range_keeps_disjoint_ranges_sorted():
+    assert merge_range([(30, 40)], 10, 20) == [(10, 20), (30, 40)]
+
+
+def test_merge_range_joins_overlapping_and_touching_ranges():
+    assert merge_range([(10, 20), (30, 40)], 15, 30) == [(10, 40)]
+    assert merge_range([(10, 20)], 20, 25) == [(10, 25)]
+
+
+def test_merge_range_inside_an_existing_one():
+    assert merge_range([(10, 40)], 15, 20) == [(10, 40)]
+
+
+def test_merge_range_spanning_several():
+    assert merge_range([(10, 20), (30, 40), (50, 60)], 5, 55) == [(5, 60)]
+
+
+def test_missing_ranges_without_coverage():
+    assert missing_ranges([], 10, 20) == [(10, 20)]
+
+
+def test_missing_ranges_fully_covered():
+    assert missing_ranges([(0, 100)], 10, 20) == []
+
+
+def test_missing_ranges_finds_the_gaps():
+    covered = [(10, 20), (30, 40)]
+    assert missing_ranges(covered, 0, 50) == [(0, 10), (20, 30), (40, 50)]
+    assert missing_ranges(covered, 15, 35) == [(20, 30)]
+
+
+def test_missing_ranges_ignores_ranges_outside():
+    assert missing_ranges([(0, 5), (60, 70)], 10, 50) == [(10, 50)]
+
+
+def test_missing_ranges_of_a_merge_is_empty():
+    covered = merge_range(merge_range([], 0, 10), 20, 30)
+    for start, end in missing_ranges(covered, 0, 30):
+        covered = merge_range(covered, start, end)
+    assert covered == [(0, 30)]
+    assert missing_ranges(covered, 0, 30) == []
@@ -0,0 +1,112 @@
+"""Tests of the circuit breaker and the rate budget."""
+import random
+
+import pytest
+
+from custom_components.mysutro import resilience
+from custom_components.mysutro.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def test_backoff_delay_is_capped():
+    rng = random.Random(1)
+    assert all(0 <= backoff_delay(attempt, 1, 30, rng) <= min(30, 2 ** attempt) for attempt in range(10))
+
+
+def test_breaker_opens_after_the_threshold(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_CLOSED
+        assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after == 60
+    assert breaker.opens == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert breaker.retry_after == 0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.opens == 2
+    clock.now += 30
+    assert breaker.retry_after == 30
+
+
+def test_released_probe_can_be_retried(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+async def test_bucket_serves_a_burst_without_waiting():
+    bucket = TokenBucket(rate=1, capacity=3)
+    assert [await bucket.async_acquire() for _ in range(3)] == [0, 0, 0]
+
+
+async def test_bucket_waits_once_the_budget_is_spent():
+    bucket = TokenBucket(rate=50, capacity=1)
+    assert await bucket.async_acquire() == 0
+    assert await bucket.async_acquire() > 0
+    assert bucket.tokens < 1
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+    bucket.tokens = 0
+    clock.now += 1
+    bucket._refill()
+    assert bucket.tokens == 2
+    clock.now += 10
+    bucket._refill()
+    assert bucket.tokens == 4
@@ -0,0 +1,114 @@
+"""Tests of the slow tier cadence and the adaptive poll scheduler."""
+from datetime import datetime, timedelta
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.mysutro.const import (
+    ADAPTIVE_EARLY,
+    ADAPTIVE_HEARTBEAT,
+    ADAPTIVE_LATE,
+    TEST_TIMES_REFRESH,
+    TIER_INTERVALS,
+)
+from custom_components.mysutro.gateway import MySutroGateway
+from custom_components.mysutro.query import ALL_FIELDS
+from custom_components.mysutro.scheduler import MySutroPollScheduler
+
+FAST = timedelta(seconds=60)
+
+
+@pytest.fixture
+def gateway():
+    return MySutroGateway(MagicMock(), "token")
+
+
+def test_every_wanted_tier_is_due_at_first(gateway):
+    assert gateway.due_tiers() == frozenset(TIER_INTERVALS)
+
+
+def test_only_tiers_of_requested_fields_are_due(gateway):
+    gateway.set_fields("entry", frozenset({"ph", "poolProfile"}))
+    assert gateway.due_tiers() == frozenset({"profile"})
+    gateway.set_fields("other", frozenset({"conflictWarning"}))
+    assert gateway.due_tiers() == frozenset({"profile", "recommendations"})
+    gateway.remove_fields("other")
+    assert gateway.due_tiers() == frozenset({"profile"})
+
+
+def test_a_consumer_without_fields_wants_everything(gateway):
+    gateway.set_fields("entry", frozenset({"ph"}))
+    gateway.set_fields("diagnostics", None)
+    assert gateway.query_fields == ALL_FIELDS
+
+
+def test_tiers_follow_their_interval(gateway):
+    now = time.monotonic()
+    for tier, interval in TIER_INTERVALS.items():
+        gateway._tier_updated[tier] = now - max(interval - 60, 0)
+    # The manual tier has no interval, it is fetched on every poll it is wanted
+    assert gateway.due_tiers() == frozenset({"manual"})
+    gateway._tier_updated["cartridge"] = now - TIER_INTERVALS["cartridge"] - 1
+    assert gateway.due_tiers() == frozenset({"manual", "cartridge"})
+
+
+def test_refresh_tiers_makes_them_due(gateway):
+    now = time.monotonic()
+    for tier in TIER_INTERVALS:
+        gateway._tier_updated[tier] = now
+    gateway.refresh_tiers("recommendations")
+    assert gateway.due_tiers() == frozenset({"manual", "recommendations"})
+    gateway.refresh_tiers()
+    assert gateway.due_tiers() == frozenset(TIER_INTERVALS)
+
+
+def _at(hour: int, minute: int = 0, days: int = 0) -> datetime:
+    return datetime(2024, 6, 3, hour, minute, tzinfo=dt_util.DEFAULT_TIME_ZONE) + timedelta(days=days)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = MySutroPollScheduler(FAST)
+    scheduler.set_test_hours([20, 8], _at(0))
+    return scheduler
+
+
+def test_without_test_hours_polls_fast():
+    scheduler = MySutroPollScheduler(FAST)
+    assert scheduler.next_expected_reading(_at(8), _at(10)) is None
+    assert scheduler.next_interval(_at(8), _at(10)) == FAST
+
+
+def test_test_times_are_fetched_again_after_a_while(scheduler):
+    assert MySutroPollScheduler(FAST).needs_test_times(_at(0))
+    assert not scheduler.needs_test_times(_at(0))
+    assert scheduler.needs_test_times(_at(0) + timedelta(seconds=TEST_TIMES_REFRESH))
+
+
+def test_next_expected_reading_follows_the_last_one(scheduler):
+    assert scheduler.next_expected_reading(_at(8, 5), _at(10)) == _at(20)
+    assert scheduler.next_expected_reading(_at(20, 5), _at(21)) == _at(8, days=1)
+
+
+def test_heartbeat_between_test_times(scheduler):
+    assert scheduler.next_interval(_at(8, 5), _at(10)) == timedelta(seconds=ADAPTIVE_HEARTBEAT)
+
+
+def test_wakes_up_before_a_test_time(scheduler):
+    now = _at(20) - timedelta(seconds=ADAPTIVE_EARLY + 600)
+    assert scheduler.next_interval(_at(8, 5), now) == timedelta(seconds=600)
+
+
+def test_polls_fast_around_a_test_time(scheduler):
+    assert scheduler.next_interval(_at(8, 5), _at(20) - timedelta(seconds=ADAPTIVE_EARLY)) == FAST
+    # The reading is late, keep polling fast until it is considered skipped
+    assert scheduler.next_interval(_at(8, 5), _at(20, 20)) == FAST
+
+
+def test_a_skipped_reading_is_not_waited_for(scheduler):
+    now = _at(20) + timedelta(seconds=ADAPTIVE_LATE + 60)
+    assert scheduler.next_expected_reading(_at(8, 5), now) == _at(8, days=1)
+    assert scheduler.next_interval(_at(8, 5), now) == timedelta(seconds=ADAPTIVE_HEARTBEAT)
@@ -0,0 +1,105 @@
+"""Tests of the rolling chemistry statistics."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.mysutro.trends import SECONDS_PER_DAY, MySutroTrends, RollingWindow
+
+HOUR = 3600
+
+
+def test_empty_window():
+    window = RollingWindow(SECONDS_PER_DAY)
+    assert len(window) == 0
+    assert window.mean is None
+    assert window.min is None
+    assert window.max is None
+    assert window.slope is None
+
+
+def test_window_statistics():
+    window = RollingWindow(SECONDS_PER_DAY)
+    for hour, value in enumerate((7.2, 7.6, 7.0, 7.4)):
+        window.add(hour * HOUR, value)
+    assert len(window) == 4
+    assert window.mean == pytest.approx(7.3)
+    assert window.min == 7.0
+    assert window.max == 7.6
+
+
+def test_window_slope_is_per_day():
+    window = RollingWindow(7 * SECONDS_PER_DAY)
+    for day in range(4):
+        window.add(day * SECONDS_PER_DAY, 7.0 + 0.1 * day)
+    assert window.slope == pytest.approx(0.1)
+
+
+def test_window_slope_needs_two_times():
+    window = RollingWindow(SECONDS_PER_DAY)
+    window.add(0, 7.0)
+    assert window.slope is None
+
+
+def test_adding_evicts_values_older_than_the_span():
+    window = RollingWindow(10.5 * HOUR)
+    for hour in range(15):
+        window.add(hour * HOUR, float(hour))
+    assert [value for _, value in window.samples()] == [float(hour) for hour in range(4, 15)]
+    assert window.mean == pytest.approx(9.0)
+
+
+def test_min_and_max_follow_eviction():
+    window = RollingWindow(3.5 * HOUR)
+    window.add(0, 1.0)
+    window.add(1 * HOUR, 9.0)
+    window.add(2 * HOUR, 5.0)
+    assert (window.min, window.max) == (1.0, 9.0)
+    # The minimum falls out of the window, the next smallest takes over
+    window.add(4 * HOUR, 6.0)
+    assert (window.min, window.max) == (5.0, 9.0)
+    # And then the maximum
+    window.add(5 * HOUR, 7.0)
+    assert (window.min, window.max) == (5.0, 7.0)
+
+
+def test_min_and_max_deques_stay_monotonic():
+    window = RollingWindow(SECONDS_PER_DAY)
+    for hour, value in enumerate((5.0, 4.0, 6.0, 3.0, 7.0)):
+        window.add(hour * HOUR, value)
+    assert [value for _, value in window._min] == [3.0, 7.0]
+    assert [value for _, value in window._max] == [7.0]
+
+
+def test_expire_without_a_new_value():
+    window = RollingWindow(2 * HOUR)
+    window.add(0, 7.0)
+    window.add(HOUR, 7.4)
+    assert window.expire(2 * HOUR) is False
+    assert window.expire(2 * HOUR + 1) is True
+    assert [value for _, value in window.samples()] == [7.4]
+    assert window.expire(4 * HOUR) is True
+    assert len(window) == 0
+    assert window.mean is None
+    assert window.expire(10 * HOUR) is False
+
+
+def test_emptied_window_starts_over():
+    window = RollingWindow(HOUR)
+    window.add(0, 1.0)
+    window.expire(10 * HOUR)
+    window.add(10 * HOUR, 3.0)
+    window.add(10 * HOUR + 1800, 5.0)
+    assert window.mean == pytest.approx(4.0)
+    assert window.samples() == [(10 * HOUR, 3.0), (10 * HOUR + 1800, 5.0)]
+
+
+def test_trends_skip_old_and_flagged_readings():
+    trends = MySutroTrends()
+    start = datetime(2024, 6, 3, tzinfo=timezone.utc)
+    assert trends.add_reading(start, {"ph": 7.2}) is True
+    assert trends.add_reading(start, {"ph": 9.0}) is False
+    assert trends.add_reading(start + timedelta(hours=1), {"ph": 9.0}, invalid=True) is True
+    assert trends.add_reading(start + timedelta(hours=2), {"ph": 7.4}) is True
+    assert trends.stats("ph_24h")["samples"] == 2
+    assert trends.stats("ph_24h")["max"] == 7.4
+    assert trends.expire(start + timedelta(days=1, hours=1)) == {"ph_24h"}